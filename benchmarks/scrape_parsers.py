@@ -0,0 +1,119 @@
+"""
+レシピページのパーサーをオフラインで検証・計測する
+
+保存済みのHTML（benchmarks/fixtures）に対して登録済みのパーサーを実行し、
+抽出結果（タイトル・材料数・手順数）をmanifest.jsonの期待値と照合したうえで
+ページ/秒・p95の解析時間・ピークRSSを表示する。通信は行わない。
+
+fixturesのHTMLは各サイトのページ構造（DOMパーサーが参照するクラス名・JSON-LD）を
+再現した手書きの代用品で、実ページの保存ではない。サイトの構造が変わった場合は合わせて更新する
+
+    python -m benchmarks.scrape_parsers
+    python -m benchmarks.scrape_parsers --iterations 200 --json
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from typing import Callable, List
+from src.services import site_parsers
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxはキロバイト、macOSはバイト単位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def _check(case: dict, result: dict) -> List[str]:
+    """期待値と異なる項目のメッセージ"""
+    errors = []
+    if result["title"] != case["title"]:
+        errors.append(f"title: expected {case['title']!r}, got {result['title']!r}")
+    for key in ("ingredients", "steps"):
+        if len(result[key]) != case[key]:
+            errors.append(f"{key}: expected {case[key]}, got {len(result[key])}")
+    return errors
+
+def _measure(parser: Callable[[str, str], dict], html: str, url: str, iterations: int) -> dict:
+    parser(html, url)  # 初回のimport・正規表現コンパイル等を除外
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        parser(html, url)
+        timings.append(time.perf_counter() - started)
+    return {
+        "pages_per_sec": iterations / sum(timings),
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p95_ms": _percentile(timings, 95) * 1000,
+    }
+
+def run(fixture_dir: str, iterations: int) -> dict:
+    with open(os.path.join(fixture_dir, "manifest.json"), encoding="utf-8") as f:
+        cases = json.load(f)
+
+    results, failures = [], []
+    for case in cases:
+        with open(os.path.join(fixture_dir, case["file"]), encoding="utf-8") as f:
+            html = f.read()
+
+        errors = _check(case, site_parsers.parse_recipe(html, case["url"]))
+        failures.extend(f"{case['file']}: {error}" for error in errors)
+
+        # 実際の取り込み経路（登録済みのサイトはDOMパーサー、それ以外はJSON-LD）と、
+        # JSON-LDを含むページではJSON-LDの抽出単体をそれぞれ計測
+        parsers = [("parse_recipe", site_parsers.parse_recipe)]
+        if site_parsers.get_parser(case["url"]) is not None and site_parsers.extract_json_ld_recipe(html, case["url"]):
+            parsers.append(("json_ld", site_parsers.extract_json_ld_recipe))
+        for name, parser in parsers:
+            results.append({
+                "fixture": case["file"],
+                "parser": name,
+                "ok": not errors,
+                **_measure(parser, html, case["url"], iterations),
+            })
+
+    return {
+        "html_parser": site_parsers.HTML_PARSER,
+        "iterations": iterations,
+        "results": results,
+        "failures": failures,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def _print_report(report: dict) -> None:
+    print(f"HTML parser: {report['html_parser']}, iterations: {report['iterations']}")
+    print(f"{'fixture':<32} {'parser':<16} {'pages/s':>10} {'mean ms':>9} {'p95 ms':>9}  check")
+    for row in report["results"]:
+        print(
+            f"{row['fixture']:<32} {row['parser']:<16} {row['pages_per_sec']:>10.1f} "
+            f"{row['mean_ms']:>9.2f} {row['p95_ms']:>9.2f}  {'ok' if row['ok'] else 'FAIL'}"
+        )
+    print(f"peak RSS: {report['peak_rss_mb']:.1f} MB")
+    for failure in report["failures"]:
+        print(f"FAIL {failure}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark and regression check for recipe page parsers")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="directory containing manifest.json and saved pages")
+    parser.add_argument("--iterations", type=int, default=50, help="timed parses per fixture and parser")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.fixtures, args.iterations)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report)
+    return 1 if report["failures"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,6 +29,7 @@ MYSQL_DATABASE=cooking_memo
 MYSQL_USER=admin
 MYSQL_PASSWORD=password
 CORS_ORIGINS=https://your-cloudfront-domain.cloudfront.net
+PHOTO_SENDFILE=x-accel-redirect
 EOF
 
 # Build and run with Docker Compose
@@ -52,6 +53,12 @@ server {
         proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
         proxy_set_header X-Forwarded-Proto \$scheme;
     }
+
+    # Photo files are sent by nginx after the app validates the request (X-Accel-Redirect)
+    location /_protected_photos/ {
+        internal;
+        alias $(pwd)/uploads/photos/;
+    }
 }
 EOF
 
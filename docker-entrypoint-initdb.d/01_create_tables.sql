@@ -45,7 +45,8 @@ CREATE TABLE tags (
     name VARCHAR(50) NOT NULL UNIQUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    INDEX idx_tags_name (name)
+    INDEX idx_tags_name (name),
+    INDEX idx_tags_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci COMMENT='タグテーブル';
 
 -- メインのレシピテーブル
@@ -69,6 +70,8 @@ CREATE TABLE recipes (
     INDEX idx_recipes_cooking_date (cooking_date),
     INDEX idx_recipes_rating (rating),
     INDEX idx_recipes_title (title),
+    INDEX idx_recipes_created (created_at, id),
+    INDEX idx_recipes_updated (updated_at),
     FULLTEXT idx_recipes_search (title, description)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci COMMENT='メインのレシピテーブル';
 
@@ -88,7 +91,8 @@ CREATE TABLE cooking_records (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新日時',   
     FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE,
     INDEX idx_recipe_cooking_date (recipe_id, cooking_date),
-    INDEX idx_cooking_date (cooking_date)
+    INDEX idx_cooking_date (cooking_date),
+    INDEX idx_cooking_records_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci, COMMENT='調理実施記録';
 
 -- 写真管理テーブル
@@ -112,7 +116,9 @@ CREATE TABLE recipe_photos (
     INDEX idx_recipe_photos_recipe_id (recipe_id),
     INDEX idx_recipe_photos_primary (recipe_id, is_primary),
     INDEX idx_recipe_photos_type (photo_type_id),
-    INDEX idx_recipe_photos_sort (recipe_id, sort_order)
+    INDEX idx_recipe_photos_sort (recipe_id, sort_order),
+    INDEX idx_recipe_photos_url (photo_url),
+    INDEX idx_recipe_photos_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci COMMENT='写真管理テーブル';
 
 -- 材料テーブル
@@ -129,7 +135,8 @@ CREATE TABLE ingredients (
     FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE,
     INDEX idx_ingredients_recipe_id (recipe_id),
     INDEX idx_ingredients_sort (recipe_id, sort_order),
-    INDEX idx_ingredients_name (name)
+    INDEX idx_ingredients_name (name),
+    INDEX idx_ingredients_updated (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci COMMENT='材料テーブル';
 
 -- 手順テーブル
@@ -145,6 +152,7 @@ CREATE TABLE steps (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (recipe_id) REFERENCES recipes(id) ON DELETE CASCADE,
     INDEX idx_steps_recipe_id (recipe_id),
+    INDEX idx_steps_updated (updated_at),
     UNIQUE KEY unique_recipe_step (recipe_id, step_number),
     FULLTEXT idx_steps_instruction (instruction)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci COMMENT='手順テーブル';
@@ -1,45 +1,151 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple, Any, AsyncIterator, Awaitable, Callable
 from src.models.recipe import Recipe, RecipePhoto, Ingredient, Step, CookingRecord, Tag, recipe_tags_table
 from src.schemas.recipe import ScrapedRecipeData, SortOrder, RecipePhotoCreate, RecipePhotoUpdate
-from sqlalchemy import select, extract, desc, asc, func
+from src.services import cache
+from sqlalchemy import select, update, delete, desc, asc, func, or_, and_
 from sqlalchemy.engine import Result
-from sqlalchemy.orm import selectinload
-from datetime import date
+from sqlalchemy.orm import selectinload, load_only
+from datetime import date, datetime, timedelta
+import base64
+import binascii
 
-async def get_all_recipes(db: AsyncSession) -> Optional[Recipe]:
+def _recipe_detail_options():
+    """レシピ詳細（全関連データ）を事前に読み込むためのオプション"""
+    return (
+        selectinload(Recipe.source_type),        # source_typeテーブル
+        selectinload(Recipe.ingredients),        # ingredientsテーブル
+        selectinload(Recipe.steps),             # stepsテーブル
+        selectinload(Recipe.recipe_photos).selectinload(RecipePhoto.photo_type), # recipe_photosテーブル
+        selectinload(Recipe.cooking_records), # cooking_recordsテーブル
+        selectinload(Recipe.categories),        # categoriesテーブル（多対多）
+        selectinload(Recipe.tags),              # tagsテーブル（多対多）
+    )
+
+def _recipe_summary_options():
+    """一覧表示（RecipeListResponse）に必要な列と関連データのみを読み込むオプション
+
+    材料・手順・調理記録・写真一覧は読み込まない
+    """
+    return (
+        load_only(
+            Recipe.id, Recipe.title, Recipe.description, Recipe.cook_time, Recipe.servings,
+            Recipe.rating, Recipe.cooking_date, Recipe.source_type_id, Recipe.created_at,
+        ),
+        selectinload(Recipe.source_type),
+        selectinload(Recipe.categories),
+        selectinload(Recipe.tags),
+    )
+
+def _recipe_options(summary: bool):
+    return _recipe_summary_options() if summary else _recipe_detail_options()
+
+def _primary_photo_id_subquery():
+    """レシピごとのメイン写真IDを返す相関サブクエリ（idx_recipe_photos_primaryを利用）"""
+    return (
+        select(func.min(RecipePhoto.id))
+        .where(RecipePhoto.recipe_id == Recipe.id, RecipePhoto.is_primary.is_(True))
+        .correlate(Recipe)
+        .scalar_subquery()
+        .label("primary_photo_id")
+    )
+
+async def _execute_recipes(db: AsyncSession, stmt, summary: bool = False) -> List[Recipe]:
+    """レシピ取得クエリを実行
+
+    summary=Trueの場合はメイン写真IDを同じクエリで取得し、
+    写真をまとめて1回で読み込んでprimary_photo属性に設定する
+    """
+    if not summary:
+        result: Result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    result: Result = await db.execute(stmt.add_columns(_primary_photo_id_subquery()))
+    rows = result.all()
+
+    photo_ids = {row.primary_photo_id for row in rows if row.primary_photo_id is not None}
+    photos = {}
+    if photo_ids:
+        photo_result = await db.execute(
+            select(RecipePhoto)
+            .options(selectinload(RecipePhoto.photo_type))
+            .where(RecipePhoto.id.in_(photo_ids))
+        )
+        photos = {photo.id: photo for photo in photo_result.scalars().all()}
+
+    recipes = []
+    for recipe, primary_photo_id in rows:
+        recipe.primary_photo = photos.get(primary_photo_id)
+        recipes.append(recipe)
+    return recipes
+
+def encode_cursor(recipe: Recipe) -> str:
+    """レシピの(created_at, id)からページングカーソルを生成"""
+    raw = f"{recipe.created_at.isoformat()}|{recipe.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """ページングカーソルを(created_at, id)に復元（不正な場合はValueError）"""
     try:
-        # 関連データを事前に読み込むためのクエリ
-        stmt = select(Recipe).options(
-            # 関連テーブルを事前に読み込み
-            selectinload(Recipe.source_type),        # source_typeテーブル
-            selectinload(Recipe.ingredients),        # ingredientsテーブル
-            selectinload(Recipe.steps),             # stepsテーブル
-            selectinload(Recipe.recipe_photos).selectinload(RecipePhoto.photo_type), # recipe_photosテーブル
-            selectinload(Recipe.cooking_records), # cooking_recordsテーブル
-            selectinload(Recipe.categories),        # categoriesテーブル（多対多）
-            selectinload(Recipe.tags),              # tagsテーブル（多対多）
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, recipe_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(recipe_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def _keyset_page_statement(
+    limit: int,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    summary: bool = False
+):
+    """作成日時・IDの降順でキーセットページングするクエリ"""
+    stmt = select(Recipe).options(*_recipe_options(summary))
+    if cursor:
+        created_at, recipe_id = cursor
+        stmt = stmt.where(
+            or_(
+                Recipe.created_at < created_at,
+                and_(Recipe.created_at == created_at, Recipe.id < recipe_id),
+            )
         )
-        result: Result = await db.execute(stmt)
-        recipe = result.scalars().all()
-        return recipe
+    return stmt.order_by(desc(Recipe.created_at), desc(Recipe.id)).limit(limit)
+
+async def get_recipes_page(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    summary: bool = False
+) -> List[Recipe]:
+    """カーソル位置から1ページ分のレシピを取得（新しい順）"""
+    try:
+        return await _execute_recipes(db, _keyset_page_statement(limit, cursor, summary), summary)
     except Exception as e:
-        print(f"Error in crud_recipe.get: {e}")
+        print(f"Error in get_recipes_page: {e}")
         raise e
 
+async def iter_recipe_chunks(db: AsyncSession, chunk_size: int) -> AsyncIterator[List[Recipe]]:
+    """全レシピをchunk_size件ずつ取得して順に返す
+
+    返したチャンクは次のチャンク取得前にセッションから切り離すため、
+    保持されるのは常に1チャンク分のオブジェクトのみ
+    """
+    cursor = None
+    while True:
+        result: Result = await db.execute(_keyset_page_statement(chunk_size, cursor))
+        recipes = list(result.scalars().all())
+        if not recipes:
+            return
+        last = recipes[-1]
+        cursor = (last.created_at, last.id)
+        yield recipes
+        db.expunge_all()
+        if len(recipes) < chunk_size:
+            return
+
 async def get_recipe_by_id(db: AsyncSession, id: int) -> Optional[Recipe]:
     try:
         # 関連データを事前に読み込むためのクエリ
-        stmt = select(Recipe).options(
-            # 関連テーブルを事前に読み込み
-            selectinload(Recipe.source_type),        # source_typeテーブル
-            selectinload(Recipe.ingredients),        # ingredientsテーブル
-            selectinload(Recipe.steps),             # stepsテーブル
-            selectinload(Recipe.recipe_photos).selectinload(RecipePhoto.photo_type), # recipe_photosテーブル
-            selectinload(Recipe.cooking_records), # cooking_recordsテーブル
-            selectinload(Recipe.categories),        # categoriesテーブル（多対多）
-            selectinload(Recipe.tags),              # tagsテーブル（多対多）
-        ).where(Recipe.id == id)
+        stmt = select(Recipe).options(*_recipe_detail_options()).where(Recipe.id == id)
         
         result: Result = await db.execute(stmt)
         recipe = result.scalar_one_or_none()
@@ -47,6 +153,85 @@ async def get_recipe_by_id(db: AsyncSession, id: int) -> Optional[Recipe]:
     except Exception as e:
         print(f"Error in crud_recipe.get: {e}")
         raise e
+async def get_recipes_by_ids(db: AsyncSession, ids: List[int]) -> List[Recipe]:
+    """ID一覧でレシピを取得（全関連データ含む・ID順）"""
+    if not ids:
+        return []
+    try:
+        stmt = select(Recipe).options(*_recipe_detail_options()).where(Recipe.id.in_(ids)).order_by(Recipe.id)
+        result: Result = await db.execute(stmt)
+        return list(result.scalars().all())
+    except Exception as e:
+        print(f"Error in get_recipes_by_ids: {e}")
+        raise e
+
+# バージョン（ETag）計算対象の子テーブル: (updated_at列, recipe_id列)
+_VERSIONED_CHILDREN = (
+    (Ingredient.updated_at, Ingredient.recipe_id),
+    (Step.updated_at, Step.recipe_id),
+    (RecipePhoto.updated_at, RecipePhoto.recipe_id),
+    (CookingRecord.updated_at, CookingRecord.recipe_id),
+)
+
+def _child_version_columns(recipe_id_column):
+    """子テーブルごとの(最終更新日時, 件数)とタグの付与状況を返す集計サブクエリ群
+
+    件数を含めることで削除も、タグIDの合計と最終更新日時を含めることで
+    タグの付け外し・名前変更も検出する
+    """
+    columns = []
+    for updated_at, fk in _VERSIONED_CHILDREN:
+        columns.append(select(func.max(updated_at)).where(fk == recipe_id_column).scalar_subquery())
+        columns.append(select(func.count()).where(fk == recipe_id_column).scalar_subquery())
+    tag_filter = recipe_tags_table.c.recipe_id == recipe_id_column
+    columns.append(select(func.count()).select_from(recipe_tags_table).where(tag_filter).scalar_subquery())
+    columns.append(select(func.sum(recipe_tags_table.c.tag_id)).where(tag_filter).scalar_subquery())
+    columns.append(
+        select(func.max(Tag.updated_at))
+        .join(recipe_tags_table, recipe_tags_table.c.tag_id == Tag.id)
+        .where(tag_filter)
+        .scalar_subquery()
+    )
+    return columns
+
+async def get_recipe_version(db: AsyncSession, recipe_id: int) -> Optional[Tuple]:
+    """レシピと関連データの更新状況を集計クエリ1回で取得（存在しない場合はNone）
+
+    戻り値の先頭はレシピ自体のupdated_at。関連データを読み込まずにETagを計算するために使う
+    """
+    try:
+        stmt = select(Recipe.updated_at, *_child_version_columns(Recipe.id)).where(Recipe.id == recipe_id)
+        result: Result = await db.execute(stmt)
+        row = result.first()
+        return tuple(row) if row is not None else None
+    except Exception as e:
+        print(f"Error in get_recipe_version: {e}")
+        raise e
+
+async def get_recipes_version(db: AsyncSession) -> Tuple:
+    """レシピ関連テーブル全体の更新状況（最終更新日時と件数）を取得
+
+    一覧ページのETag計算に使う。いずれかのレシピが変わると値が変わる。
+    最終更新日時はupdated_atのインデックス、件数は任意のインデックスの走査で求まる
+    """
+    try:
+        columns = [
+            select(func.max(Recipe.updated_at)).scalar_subquery(),
+            select(func.count()).select_from(Recipe).scalar_subquery(),
+        ]
+        for updated_at, fk in _VERSIONED_CHILDREN:
+            columns.append(select(func.max(updated_at)).scalar_subquery())
+            columns.append(select(func.count()).select_from(fk.table).scalar_subquery())
+        columns.append(select(func.count()).select_from(recipe_tags_table).scalar_subquery())
+        columns.append(select(func.sum(recipe_tags_table.c.tag_id)).scalar_subquery())
+        columns.append(select(func.max(Tag.updated_at)).scalar_subquery())
+
+        result: Result = await db.execute(select(*columns))
+        return tuple(result.one())
+    except Exception as e:
+        print(f"Error in get_recipes_version: {e}")
+        raise e
+
 async def get_cooking_record(db: AsyncSession, id: int, date: date) -> Optional[CookingRecord]:
     result = await db.execute(
         select(CookingRecord).where(CookingRecord.recipe_id == id, CookingRecord.cooking_date == date)
@@ -62,50 +247,63 @@ async def get_cooking_record_by_id(db: AsyncSession, cooking_record_id: int) ->
     cooking_record = result.scalar_one_or_none()
     return cooking_record
 
-async def get_recipes_by_cooking_date(db: AsyncSession, cooking_date: date) -> List[Recipe]:
-    """指定した日付で調理したレシピを全て取得"""
+def month_range(year: int, month: int) -> Tuple[date, date]:
+    """指定年月の[月初, 翌月初)を返す（不正な年月はValueError）"""
+    first = date(year, month, 1)
+    next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return first, next_month
+
+async def get_recipes_by_date_range(db: AsyncSession, start: date, end: date, summary: bool = False) -> List[Recipe]:
+    """[start, end)の期間に調理したレシピを全て取得（期間内に複数回調理していても1件）
+
+    cooking_dateを関数で包まない範囲条件にすることでidx_cooking_dateを使用する
+    """
     try:
-        # cooking_recordsから指定日付のrecipe_idを取得し、関連するレシピを取得
+        # cooking_recordsから期間内のrecipe_idを取得し、関連するレシピを取得
+        recipe_ids = select(CookingRecord.recipe_id).where(
+            CookingRecord.cooking_date >= start,
+            CookingRecord.cooking_date < end
+        )
         stmt = select(Recipe).options(
-            selectinload(Recipe.source_type),
-            selectinload(Recipe.ingredients),
-            selectinload(Recipe.steps),
-            selectinload(Recipe.recipe_photos).selectinload(RecipePhoto.photo_type),
-            selectinload(Recipe.cooking_records),
-            selectinload(Recipe.categories),
-            selectinload(Recipe.tags),
-        ).join(CookingRecord).where(CookingRecord.cooking_date == cooking_date)
+            *_recipe_options(summary)
+        ).where(Recipe.id.in_(recipe_ids))
         
-        result: Result = await db.execute(stmt)
-        recipes = result.scalars().all()
-        return list(recipes)
+        return await _execute_recipes(db, stmt, summary)
     except Exception as e:
-        print(f"Error in get_recipes_by_cooking_date: {e}")
+        print(f"Error in get_recipes_by_date_range: {e}")
         raise e
 
-async def get_recipes_by_month(db: AsyncSession, year: int, month: int) -> List[Recipe]:
-    """指定した年月で調理したレシピを全て取得"""
+async def get_calendar(db: AsyncSession, start: date, end: date) -> Tuple[List, List[Recipe]]:
+    """[start, end)の調理記録と、それらのレシピ（一覧表示用・重複なし）を取得
+
+    調理記録は(id, recipe_id, cooking_date)の列のみを日付順で返す
+    """
     try:
-        # cooking_recordsから指定年月のrecipe_idを取得し、関連するレシピを取得
-        stmt = select(Recipe).options(
-            selectinload(Recipe.source_type),
-            selectinload(Recipe.ingredients),
-            selectinload(Recipe.steps),
-            selectinload(Recipe.recipe_photos).selectinload(RecipePhoto.photo_type),
-            selectinload(Recipe.cooking_records),
-            selectinload(Recipe.categories),
-            selectinload(Recipe.tags),
-        ).join(CookingRecord).where(
-            extract('year', CookingRecord.cooking_date) == year,
-            extract('month', CookingRecord.cooking_date) == month
+        records_result = await db.execute(
+            select(CookingRecord.id, CookingRecord.recipe_id, CookingRecord.cooking_date)
+            .where(CookingRecord.cooking_date >= start, CookingRecord.cooking_date < end)
+            .order_by(CookingRecord.cooking_date, CookingRecord.id)
         )
-        
-        result: Result = await db.execute(stmt)
-        recipes = result.scalars().all()
-        return list(recipes)
+        records = records_result.all()
+
+        recipe_ids = {record.recipe_id for record in records}
+        recipes = []
+        if recipe_ids:
+            stmt = select(Recipe).options(*_recipe_summary_options()).where(Recipe.id.in_(recipe_ids))
+            recipes = await _execute_recipes(db, stmt, summary=True)
+        return records, recipes
     except Exception as e:
-        print(f"Error in get_recipes_by_month: {e}")
+        print(f"Error in get_calendar: {e}")
         raise e
+
+async def get_recipes_by_cooking_date(db: AsyncSession, cooking_date: date, summary: bool = False) -> List[Recipe]:
+    """指定した日付で調理したレシピを全て取得"""
+    return await get_recipes_by_date_range(db, cooking_date, cooking_date + timedelta(days=1), summary)
+
+async def get_recipes_by_month(db: AsyncSession, year: int, month: int, summary: bool = False) -> List[Recipe]:
+    """指定した年月で調理したレシピを全て取得"""
+    first, next_month = month_range(year, month)
+    return await get_recipes_by_date_range(db, first, next_month, summary)
 # crud/crud_recipe.py
 async def get_by_source_url(db: AsyncSession, source_url: str):
     """URLでレシピを検索"""
@@ -163,9 +361,72 @@ async def create_from_scraped_data(
     db.add(cooking_record)
     
     await db.commit()
+    await cache.invalidate_new_recipe(cooking_date)
     await db.refresh(recipe)
     complete_recipe  = await get_recipe_by_id(db, recipe.id)
     return complete_recipe
+async def get_recipe_ids_by_source_urls(db: AsyncSession, source_urls: List[str]) -> Dict[str, int]:
+    """取り込み元URLから登録済みレシピのIDを1回のクエリでまとめて取得"""
+    if not source_urls:
+        return {}
+    result = await db.execute(
+        select(Recipe.source_url, func.min(Recipe.id))
+        .where(Recipe.source_url.in_(source_urls))
+        .group_by(Recipe.source_url)
+    )
+    return {source_url: recipe_id for source_url, recipe_id in result.all()}
+
+async def create_many_from_scraped_data(
+    db: AsyncSession,
+    *,
+    scraped_list: List[ScrapedRecipeData],
+    cooking_date: date,
+    existing_recipe_ids: List[int] = ()
+) -> List[int]:
+    """スクレイピングした複数レシピの作成と、登録済みレシピへの調理記録追加を1トランザクションで行う
+
+    Returns:
+        作成したレシピのID（scraped_listの順）
+    """
+    try:
+        recipes = []
+        for scraped_data in scraped_list:
+            recipe = Recipe(
+                title=scraped_data["title"],
+                source_type_id=1,
+                source_url=scraped_data["source_url"],
+                ingredients=[Ingredient(name=ing_data) for ing_data in scraped_data["ingredients"]],
+                steps=[
+                    Step(step_number=i + 1, instruction=step_data)
+                    for i, step_data in enumerate(scraped_data["steps"])
+                ],
+                cooking_records=[CookingRecord(cooking_date=cooking_date)],
+            )
+            if scraped_data["photo_url"]:
+                recipe.recipe_photos = [
+                    RecipePhoto(photo_url=scraped_data["photo_url"], photo_type_id=1, is_primary=True)
+                ]
+            recipes.append(recipe)
+
+        # 関連テーブルはテーブルごとにまとめてINSERTされる
+        db.add_all(recipes)
+        db.add_all([
+            CookingRecord(recipe_id=recipe_id, cooking_date=cooking_date) for recipe_id in existing_recipe_ids
+        ])
+        # commit後はオブジェクトが失効し、属性の参照で遅延ロードが走るためIDはflush時点で取得する
+        await db.flush()
+        recipe_ids = [recipe.id for recipe in recipes]
+        await db.commit()
+        await cache.invalidate_new_recipe(cooking_date)
+        for recipe_id in existing_recipe_ids:
+            await cache.invalidate_cooking_record(recipe_id, cooking_date)
+
+        return recipe_ids
+    except Exception as e:
+        print(f"Error in create_many_from_scraped_data: {e}")
+        await db.rollback()
+        raise e
+
 async def create_from_book_photo(
     db: AsyncSession, 
     *,
@@ -213,6 +474,7 @@ async def create_from_book_photo(
         db.add(cooking_record)
         
         await db.commit()
+        await cache.invalidate_new_recipe(cooking_date)
         await db.refresh(recipe)
         complete_recipe = await get_recipe_by_id(db, recipe.id)
         return complete_recipe
@@ -222,6 +484,50 @@ async def create_from_book_photo(
         await db.rollback()
         raise e
 
+async def create_many_from_book_photos(
+    db: AsyncSession,
+    *,
+    recipes_data: List[dict],
+    cooking_date: date,
+    source_book_title: str = None,
+    source_pages: List[Optional[int]] = None
+) -> List[Recipe]:
+    """書籍写真から抽出した複数レシピを1トランザクションでまとめて作成"""
+    try:
+        source_pages = source_pages or [None] * len(recipes_data)
+        recipes = []
+        for recipe_data, source_page in zip(recipes_data, source_pages):
+            recipe = Recipe(
+                title=recipe_data["title"],
+                source_type_id=2,  # book source type
+                source_book_title=source_book_title,
+                source_page=source_page,
+                ingredients=[
+                    Ingredient(name=ingredient_text, sort_order=i + 1)
+                    for i, ingredient_text in enumerate(recipe_data["ingredients"])
+                ],
+                steps=[
+                    Step(step_number=i + 1, instruction=step_text)
+                    for i, step_text in enumerate(recipe_data["steps"])
+                ],
+                cooking_records=[CookingRecord(cooking_date=cooking_date)],
+            )
+            recipes.append(recipe)
+
+        # 関連テーブルはテーブルごとにまとめてINSERTされる
+        db.add_all(recipes)
+        # commit後はオブジェクトが失効するため、IDはflush時点で取得する
+        await db.flush()
+        recipe_ids = [recipe.id for recipe in recipes]
+        await db.commit()
+        await cache.invalidate_new_recipe(cooking_date)
+
+        return await get_recipes_by_ids(db, recipe_ids)
+    except Exception as e:
+        print(f"Error in create_many_from_book_photos: {e}")
+        await db.rollback()
+        raise e
+
 async def register_only_record(db: AsyncSession, recipe_id: int, cooking_date: date) -> None: 
     cooking_record = CookingRecord(
         recipe_id=recipe_id,
@@ -230,14 +536,17 @@ async def register_only_record(db: AsyncSession, recipe_id: int, cooking_date: d
     db.add(cooking_record)
     
     await db.commit()
+    await cache.invalidate_cooking_record(recipe_id, cooking_date)
     return cooking_record
 
 #delete
 async def delete_recipe(db: AsyncSession, recipe: Recipe):
     """レシピを削除"""
     try:
+        recipe_id = recipe.id
         await db.delete(recipe)
         await db.commit()
+        await cache.invalidate_recipe(recipe_id)
         return True
     except Exception as e:
         print(f"Error in crud_recipe.delete_recipe: {e}")
@@ -247,8 +556,10 @@ async def delete_recipe(db: AsyncSession, recipe: Recipe):
 async def delete_cooking_record(db: AsyncSession, cooking_record: CookingRecord):
     """日付で管理しているデータを削除"""
     try:
+        recipe_id, cooking_date = cooking_record.recipe_id, cooking_record.cooking_date
         await db.delete(cooking_record)
         await db.commit()
+        await cache.invalidate_cooking_record(recipe_id, cooking_date)
         return True
     except Exception as e:
         print(f"Error in crud_recipe.delete_recipe: {e}")
@@ -260,19 +571,12 @@ async def search_recipes(
     tag_ids: Optional[List[int]] = None,
     limit: Optional[int] = None,
     sort_by_created_at: Optional[bool] = False,
-    sort_order: Optional[SortOrder] = SortOrder.desc
+    sort_order: Optional[SortOrder] = SortOrder.desc,
+    summary: bool = False
 ) -> List[Recipe]:
     """レシピを検索（AND条件でタグ絞り込み）"""
     try:
-        stmt = select(Recipe).options(
-            selectinload(Recipe.source_type),
-            selectinload(Recipe.ingredients),
-            selectinload(Recipe.steps),
-            selectinload(Recipe.recipe_photos).selectinload(RecipePhoto.photo_type),
-            selectinload(Recipe.cooking_records),
-            selectinload(Recipe.categories),
-            selectinload(Recipe.tags),
-        )
+        stmt = select(Recipe).options(*_recipe_options(summary))
         
         # タグIDで絞り込み（AND条件）
         if tag_ids and len(tag_ids) > 0:
@@ -304,9 +608,7 @@ async def search_recipes(
         if limit:
             stmt = stmt.limit(limit)
         
-        result: Result = await db.execute(stmt)
-        recipes = result.scalars().all()
-        return list(recipes)
+        return await _execute_recipes(db, stmt, summary)
     except Exception as e:
         print(f"Error in search_recipes: {e}")
         raise e
@@ -339,6 +641,7 @@ async def grant_tag_to_recipe(db: AsyncSession, recipe_id: int, tag_id: int) ->
         stmt = recipe_tags_table.insert().values(recipe_id=recipe_id, tag_id=tag_id)
         await db.execute(stmt)
         await db.commit()
+        await cache.invalidate_recipe(recipe_id)
         
         # 更新されたレシピを返す
         return await get_recipe_by_id(db, recipe_id)
@@ -373,6 +676,7 @@ async def remove_tag_from_recipe(db: AsyncSession, recipe_id: int, tag_id: int)
         )
         await db.execute(stmt)
         await db.commit()
+        await cache.invalidate_recipe(recipe_id)
         
         # 更新されたレシピを返す
         return await get_recipe_by_id(db, recipe_id)
@@ -424,6 +728,7 @@ async def update_recipe_photo(db: AsyncSession, recipe_id: int, photo_id: int, p
             setattr(photo, field, value)
         
         await db.commit()
+        await cache.invalidate_recipe(recipe_id)
         await db.refresh(photo)
         
         # photo_typeを事前読み込みして返す
@@ -452,6 +757,92 @@ async def get_recipe_photo_by_id_only(db: AsyncSession, photo_id: int) -> Option
         print(f"Error in get_recipe_photo_by_id_only: {e}")
         raise e
 
+# 参照（recipe_photosの行）を追加した後、commit前に画像ファイルを保存するコールバック。
+# 写真に設定する値（width・height等）を返す
+StorePhotoFile = Callable[[], Awaitable[Dict[str, Any]]]
+
+async def replace_photo_url(
+    db: AsyncSession,
+    old_url: str,
+    new_url: str,
+    *,
+    file_size: Optional[int] = None,
+    store_file: Optional[StorePhotoFile] = None
+) -> int:
+    """同じ画像URLを参照している写真をまとめて差し替え（外部画像を保存した後の付け替え用）
+
+    store_fileは付け替えのUPDATE後・commit前に呼ぶ（release_photo_fileと同じURLの行で直列化される）
+    """
+    try:
+        result = await db.execute(
+            select(RecipePhoto.recipe_id).where(RecipePhoto.photo_url == old_url).distinct()
+        )
+        recipe_ids = result.scalars().all()
+        if not recipe_ids:
+            return 0
+
+        result = await db.execute(
+            update(RecipePhoto)
+            .where(RecipePhoto.photo_url == old_url)
+            .values(photo_url=new_url, file_size=file_size)
+        )
+        updated = result.rowcount
+        if store_file is not None:
+            values = await store_file()
+            if values:
+                await db.execute(update(RecipePhoto).where(RecipePhoto.photo_url == new_url).values(**values))
+        await db.commit()
+        for recipe_id in recipe_ids:
+            await cache.invalidate_recipe(recipe_id)
+        return updated
+    except Exception as e:
+        print(f"Error in replace_photo_url: {e}")
+        await db.rollback()
+        raise e
+
+async def release_photo_file(
+    db: AsyncSession,
+    photo_url: str,
+    *,
+    photo_id: Optional[int] = None,
+    remove_files: Optional[Callable[[], Awaitable[None]]] = None
+) -> bool:
+    """写真を削除し（photo_id指定時）、同じURLの参照が残っていなければ画像ファイルも削除する
+
+    同じURLの行をSELECT ... FOR UPDATEでロックして参照数を数え、ファイルを削除してからcommitする。
+    参照を追加する側（create_recipe_photo / replace_photo_url）は行をflushしてからファイルを保存するため、
+    複数ワーカーでも参照の残っているファイルを削除しない
+
+    Returns:
+        ファイルを削除した場合True
+    """
+    try:
+        result = await db.execute(
+            select(RecipePhoto.id, RecipePhoto.recipe_id)
+            .where(RecipePhoto.photo_url == photo_url)
+            .with_for_update()
+        )
+        rows = result.all()
+        recipe_id = None
+        if photo_id is not None:
+            recipe_id = next((row.recipe_id for row in rows if row.id == photo_id), None)
+            if recipe_id is None:
+                raise ValueError(f"Photo with id {photo_id} not found")
+            await db.execute(delete(RecipePhoto).where(RecipePhoto.id == photo_id))
+
+        remaining = len(rows) - (1 if photo_id is not None else 0)
+        removed = remaining == 0 and remove_files is not None
+        if removed:
+            await remove_files()
+        await db.commit()
+        if recipe_id is not None:
+            await cache.invalidate_recipe(recipe_id)
+        return removed
+    except Exception as e:
+        print(f"Error in release_photo_file: {e}")
+        await db.rollback()
+        raise e
+
 async def delete_recipe_photo_by_id(db: AsyncSession, photo_id: int) -> bool:
     """写真IDのみで写真を削除"""
     try:
@@ -463,8 +854,10 @@ async def delete_recipe_photo_by_id(db: AsyncSession, photo_id: int) -> bool:
         if not photo:
             raise ValueError(f"Photo with id {photo_id} not found")
         
+        recipe_id = photo.recipe_id
         await db.delete(photo)
         await db.commit()
+        await cache.invalidate_recipe(recipe_id)
         
         return True
     except Exception as e:
@@ -472,8 +865,15 @@ async def delete_recipe_photo_by_id(db: AsyncSession, photo_id: int) -> bool:
         await db.rollback()
         raise e
 
-async def create_recipe_photo(db: AsyncSession, recipe_id: int, cooking_record_id: int, photo_data: RecipePhotoCreate) -> RecipePhoto:
-    """レシピ写真を作成"""
+async def create_recipe_photo(
+    db: AsyncSession,
+    recipe_id: int,
+    cooking_record_id: int,
+    photo_data: RecipePhotoCreate,
+    *,
+    store_file: Optional[StorePhotoFile] = None
+) -> RecipePhoto:
+    """レシピ写真を作成（store_fileは写真の行をflushした後・commit前に呼ぶ）"""
     try:
         # レシピの存在確認
         recipe = await get_recipe_by_id(db, recipe_id)
@@ -498,11 +898,19 @@ async def create_recipe_photo(db: AsyncSession, recipe_id: int, cooking_record_i
             is_primary=photo_data.is_primary,
             sort_order=photo_data.sort_order,
             alt_text=photo_data.alt_text,
-            file_size=photo_data.file_size
+            file_size=photo_data.file_size,
+            width=photo_data.width,
+            height=photo_data.height
         )
         
         db.add(photo)
+        if store_file is not None:
+            # 行を先に書き込んでから保存する（同じ画像のファイル削除と競合しないように）
+            await db.flush()
+            for key, value in (await store_file()).items():
+                setattr(photo, key, value)
         await db.commit()
+        await cache.invalidate_recipe(recipe_id)
         await db.refresh(photo)
         
         # photo_typeを事前読み込みして返す
@@ -1,8 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from datetime import datetime
 from src.models.recipe import Tag
-from sqlalchemy import select
+from sqlalchemy import select, func
 from sqlalchemy.engine import Result
+from src.services import cache
 
 async def get_all_tags(db: AsyncSession) -> List[Tag]:
     """全てのタグを取得"""
@@ -15,6 +17,16 @@ async def get_all_tags(db: AsyncSession) -> List[Tag]:
         print(f"Error in get_all_tags: {e}")
         raise e
 
+async def get_tags_version(db: AsyncSession) -> Tuple[Optional[datetime], int]:
+    """タグ一覧の更新状況（最終更新日時, 件数）を取得"""
+    try:
+        stmt = select(func.max(Tag.updated_at), func.count(Tag.id))
+        result: Result = await db.execute(stmt)
+        return tuple(result.one())
+    except Exception as e:
+        print(f"Error in get_tags_version: {e}")
+        raise e
+
 async def get_tag_by_id(db: AsyncSession, tag_id: int) -> Optional[Tag]:
     """IDでタグを取得"""
     try:
@@ -43,6 +55,7 @@ async def create_tag(db: AsyncSession, name: str) -> Tag:
         tag = Tag(name=name)
         db.add(tag)
         await db.commit()
+        await cache.tag_list_cache.clear()
         await db.refresh(tag)
         return tag
     except Exception as e:
@@ -55,6 +68,8 @@ async def update_tag(db: AsyncSession, tag: Tag, name: str) -> Tag:
     try:
         tag.name = name
         await db.commit()
+        # タグ名は各レシピ詳細に含まれるため全て無効化
+        await cache.invalidate_tags()
         await db.refresh(tag)
         return tag
     except Exception as e:
@@ -67,6 +82,7 @@ async def delete_tag(db: AsyncSession, tag: Tag) -> bool:
     try:
         await db.delete(tag)
         await db.commit()
+        await cache.invalidate_tags()
         return True
     except Exception as e:
         print(f"Error in delete_tag: {e}")
@@ -1,7 +1,13 @@
+from sqlalchemy import event
 from sqlalchemy.engine.url import URL
+from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from dataclasses import dataclass
 from os import environ
+import time
+from src.services.metrics import metrics
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -18,18 +24,73 @@ else:
         query={"charset":"utf8mb4"}
     )
 
-async_engine = create_async_engine(
-    ASYNC_DB_URL,
-    connect_args={
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """DB接続プールの設定（環境変数から読み込む）"""
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: float = 30
+    pool_recycle: int = 3600
+    echo: bool = False
+    statement_timeout_ms: int = 0  # 0の場合は無制限
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        return cls(
+            pool_size=int(environ.get('DB_POOL_SIZE', cls.pool_size)),
+            max_overflow=int(environ.get('DB_MAX_OVERFLOW', cls.max_overflow)),
+            pool_timeout=float(environ.get('DB_POOL_TIMEOUT', cls.pool_timeout)),
+            pool_recycle=int(environ.get('DB_POOL_RECYCLE', cls.pool_recycle)),
+            echo=environ.get('DB_ECHO', 'false').lower() in ('1', 'true', 'yes'),
+            statement_timeout_ms=int(environ.get('DB_STATEMENT_TIMEOUT_MS', cls.statement_timeout_ms)),
+        )
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """接続取得の待ち時間をメトリクスに記録するプール"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except SQLAlchemyTimeoutError:
+            metrics.inc("db.pool.timeouts")
+            raise
+        finally:
+            metrics.observe("db.pool.checkout_wait", time.perf_counter() - start)
+
+def _record_pool_usage(pool) -> None:
+    metrics.set_gauge("db.pool.size", pool.size())
+    metrics.set_gauge("db.pool.checked_out", pool.checkedout())
+    metrics.set_gauge("db.pool.overflow", max(0, pool.overflow()))
+
+def create_engine_from_settings(settings: DatabaseSettings):
+    connect_args = {
         "charset": "utf8mb4",
         "use_unicode": True,
-    },
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=True
-)
+    }
+    if settings.statement_timeout_ms:
+        # MySQLのSELECT実行時間の上限（ミリ秒）
+        connect_args["init_command"] = f"SET SESSION max_execution_time={settings.statement_timeout_ms}"
+
+    engine = create_async_engine(
+        ASYNC_DB_URL,
+        connect_args=connect_args,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_pre_ping=True,
+        pool_recycle=settings.pool_recycle,
+        echo=settings.echo
+    )
+
+    pool = engine.sync_engine.pool
+    event.listen(pool, "checkout", lambda *args: _record_pool_usage(pool))
+    event.listen(pool, "checkin", lambda *args: _record_pool_usage(pool))
+    return engine
+
+db_settings = DatabaseSettings.from_env()
+async_engine = create_engine_from_settings(db_settings)
 
 async_session = sessionmaker(
     autocommit=False, autoflush=False, bind=async_engine, class_=AsyncSession
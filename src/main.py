@@ -1,6 +1,13 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.routers import recipe, tag, photo
+from src.routers import recipe, tag, photo, metrics
+from src.services import http_client
+from src.services.cache import close_cache
+from src.services import image as services_image
+from src.services import photo_fetch
+from src.services import ocr_jobs
+from src.services.ocr_executor import ocr_executor
 
 origins = [
       "http://localhost:5173",
@@ -9,7 +16,18 @@ origins = [
       "https://d3fnspeoqks5i8.cloudfront.net",
 ]
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+      # 再起動前に中断されたOCRジョブを片付ける
+      await ocr_jobs.sweep_job_dir()
+      yield
+      photo_fetch.shutdown()
+      await http_client.close_client()
+      ocr_executor.shutdown()
+      services_image.shutdown()
+      await close_cache()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
       CORSMiddleware,
@@ -17,8 +35,10 @@ app.add_middleware(
       allow_credentials=True,
       allow_methods=["*"],
       allow_headers=["*"],
+      expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
 app.include_router(recipe.router)
 app.include_router(tag.router)
 app.include_router(photo.router)
+app.include_router(metrics.router)
@@ -57,7 +57,7 @@ class Tag(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, nullable=False, index=True)
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
     recipes = relationship("Recipe", secondary=recipe_tags_table, back_populates="tags")
 
 class Recipe(Base):
@@ -76,7 +76,7 @@ class Recipe(Base):
     cooking_date = Column(Date, index=True)
     rating = Column(Integer)
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
     # リレーション
     source_type = relationship("SourceType", back_populates="recipes")
     recipe_photos = relationship("RecipePhoto", back_populates="recipe", cascade="all, delete-orphan")
@@ -99,7 +99,7 @@ class CookingRecord(Base):
     estimated_cost = Column(DECIMAL(10, 2))
     occasion = Column(String(100))
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
     # リレーション
     recipe = relationship("Recipe", back_populates="cooking_records")
     photos = relationship("RecipePhoto", back_populates="cooking_record", cascade="all, delete-orphan")
@@ -119,7 +119,7 @@ class RecipePhoto(Base):
     width = Column(Integer)
     height = Column(Integer)
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
     
     recipe = relationship("Recipe", back_populates="recipe_photos")
     cooking_record = relationship("CookingRecord", back_populates="photos")
@@ -136,7 +136,7 @@ class Ingredient(Base):
     sort_order = Column(Integer, default=0)
     notes = Column(Text)
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
     recipe = relationship("Recipe", back_populates="ingredients")
 
 class Step(Base):
@@ -150,5 +150,5 @@ class Step(Base):
     temperature = Column(Integer)
     notes = Column(Text)
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
     recipe = relationship("Recipe", back_populates="steps")    
\ No newline at end of file
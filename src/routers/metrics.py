@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from src.services.metrics import metrics
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    """プロセス内のメトリクスを取得"""
+    return metrics.snapshot()
@@ -1,30 +1,61 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Path
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Path, Query, Request
+from fastapi.responses import FileResponse, RedirectResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 import src.schemas.recipe as recipe_schema
 from src.cruds import recipe as crud_recipe
 from src.db import get_db
-import aiofiles
+import src.services.image as services_image
+from src.services import upload as services_upload
+from src.services.http_cache import is_not_modified
+from src.services.storage import HASHED_FILENAME_PATTERN, IMMUTABLE_CACHE_CONTROL, S3_PRESIGN_EXPIRES, photo_storage
+import src.services.storage as services_storage
+from PIL import UnidentifiedImageError
 import os
-import uuid
+import re
+from os import environ
 from pathlib import Path as PathLib
 from typing import Optional
 
 router = APIRouter()
 
-# 画像保存用ディレクトリ
-UPLOAD_DIR = "/workspace/uploads/photos"
+# 画像の上限サイズと形式（保存先はPHOTO_STORAGE_BACKEND / PHOTO_UPLOAD_DIRで設定）
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
-# ディレクトリが存在しない場合は作成
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# 配信を許可するファイル名（ディレクトリ区切りや".."を含むものは拒否）
+SAFE_FILENAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+\.(jpg|jpeg|png|gif|webp)$")
+# ハッシュ名でない旧形式のファイル（ETagで再検証させる）
+LEGACY_CACHE_CONTROL = "public, max-age=86400"
+# ファイル本体の送信をフロントのプロキシに任せる方式（"" / "x-accel-redirect" / "x-sendfile"）
+PHOTO_SENDFILE = environ.get("PHOTO_SENDFILE", "").lower()
+# X-Accel-Redirectで指定するnginxのinternal location
+PHOTO_ACCEL_REDIRECT_PREFIX = environ.get("PHOTO_ACCEL_REDIRECT_PREFIX", "/_protected_photos/")
 
-@router.post("/recipe/{recipe_id}/cooking-record/{cooking_record_id}/photo/upload", response_model=recipe_schema.RecipePhotoResponse)
+# ボディを逐次読み込むためUploadFileを使わないので、OpenAPI上のリクエスト形式を明示
+_UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+@router.post(
+    "/recipe/{recipe_id}/cooking-record/{cooking_record_id}/photo/upload",
+    response_model=recipe_schema.RecipePhotoResponse,
+    openapi_extra=_UPLOAD_REQUEST_BODY,
+)
 async def upload_recipe_photo(
+    request: Request,
     recipe_id: int = Path(..., description="レシピID"),
     cooking_record_id: int = Path(..., description="調理記録ID"),
-    file: UploadFile = File(...),
     photo_type_id: int = 3,  # デフォルトで"my_photo"
     is_primary: bool = False,
     sort_order: int = 0,
@@ -33,65 +64,128 @@ async def upload_recipe_photo(
 ):
     """画像ファイルをアップロードしてレシピ写真を作成"""
     try:
-        # ファイル検証
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="No file provided")
+        # 一時ファイルへ逐次書き込み（上限超過・画像以外はその時点で中断）
+        try:
+            received = await services_upload.receive_image_upload(request, "file", photo_storage.work_dir, MAX_FILE_SIZE)
+        except services_upload.UploadTooLargeError:
+            raise HTTPException(status_code=413, detail="File too large")
+        except services_upload.UnsupportedImageError:
+            raise HTTPException(status_code=400, detail="File type not allowed")
+        except services_upload.MissingUploadError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        file_ext = PathLib(file.filename).suffix.lower()
+        # 拡張子はファイル名ではなく先頭バイトで判定したものを使う
+        file_ext = received.extension
         if file_ext not in ALLOWED_EXTENSIONS:
+            os.remove(received.temp_path)
             raise HTTPException(status_code=400, detail=f"File type {file_ext} not allowed")
         
-        # ファイルサイズチェック
-        content = await file.read()
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="File too large")
-        
-        # ユニークなファイル名を生成
-        unique_filename = f"recipe_{recipe_id}_cooking_{cooking_record_id}_{uuid.uuid4().hex}{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
-        
-        # ファイルを保存
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
-        
+        # 内容のハッシュをファイル名にする（同じ画像は1ファイルを共有し、参照数はrecipe_photosで管理）
+        stored_filename = f"{received.sha256}{file_ext}"
         # DBに保存するのはファイルパスのみ
-        photo_url = f"/uploads/photos/{unique_filename}"
+        photo_url = f"/uploads/photos/{stored_filename}"
         
-        # 写真データを作成
+        async def store_file():
+            # 保存先に移し、サムネイル等の派生画像を生成して元画像の解像度を取得（既にあれば再利用）
+            try:
+                stored = await services_storage.store_photo(received.temp_path, received.sha256, file_ext)
+            except UnidentifiedImageError:
+                raise HTTPException(status_code=400, detail="Invalid image file")
+            return {"width": stored.width, "height": stored.height}
+
+        # 写真データを作成（解像度はファイルの保存時に設定）
         photo_data = recipe_schema.RecipePhotoCreate(
             photo_url=photo_url,
             photo_type_id=photo_type_id,
             is_primary=is_primary,
             sort_order=sort_order,
             alt_text=alt_text,
-            file_size=len(content),
-            # 画像の解像度は必要に応じて追加実装
+            file_size=received.size,
         )
-        
-        created_photo = await crud_recipe.create_recipe_photo(db, recipe_id, cooking_record_id, photo_data)
+        try:
+            created_photo = await crud_recipe.create_recipe_photo(
+                db, recipe_id, cooking_record_id, photo_data, store_file=store_file
+            )
+        except Exception:
+            # 他の写真から参照されていないファイルのみ削除
+            await crud_recipe.release_photo_file(
+                db, photo_url, remove_files=lambda: services_storage.remove_photo(stored_filename)
+            )
+            raise
+        finally:
+            if os.path.exists(received.temp_path):
+                os.remove(received.temp_path)
         return created_photo
         
+    except HTTPException:
+        raise
     except ValueError as e:
         if "not found" in str(e):
             raise HTTPException(status_code=404, detail=str(e))
         else:
             raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        # ファイルが作成されていた場合は削除
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
         print(f"Error in upload_recipe_photo: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/uploads/photos/{filename}")
-async def get_photo(filename: str):
-    """保存された画像ファイルを配信"""
-    file_path = os.path.join(UPLOAD_DIR, filename)
+async def get_photo(
+    request: Request,
+    filename: str,
+    size: Optional[int] = Query(None, ge=1, description="表示サイズ（長辺px）。指定サイズ以上で最小の派生画像を返す")
+):
+    """保存された画像ファイルを配信（Range・If-None-Match対応）"""
+    if not SAFE_FILENAME_PATTERN.match(filename):
+        raise HTTPException(status_code=404, detail="File not found")
+    served_filename = filename
     
-    if not os.path.exists(file_path):
+    if size is not None:
+        derivative_size = services_image.select_derivative_size(size)
+        if derivative_size is not None:
+            derivative = services_image.derivative_filename(PathLib(filename).stem, derivative_size)
+            # ハッシュ名の写真は必ず派生画像がある。旧形式の写真は派生画像がなければ原寸を返す
+            if HASHED_FILENAME_PATTERN.match(filename) or await photo_storage.exists(derivative):
+                served_filename = derivative
+    
+    file_path = photo_storage.local_path(served_filename)
+    if file_path is None:
+        # オブジェクトストレージの画像は署名付きURLへリダイレクトし、本体はAPIを経由させない
+        signed_url = await photo_storage.signed_url(served_filename)
+        if signed_url is None:
+            raise HTTPException(status_code=500, detail="Photo storage does not support serving files")
+        return RedirectResponse(
+            signed_url,
+            status_code=307,
+            headers={"Cache-Control": f"private, max-age={S3_PRESIGN_EXPIRES // 2}"},
+        )
+    
+    try:
+        stat_result = os.stat(file_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
     
-    return FileResponse(file_path)
+    if HASHED_FILENAME_PATTERN.match(served_filename):
+        # ハッシュ名のファイルは内容が変わらないので、ハッシュ（と派生サイズ）をそのままETagにする
+        etag = f'"{PathLib(served_filename).stem}"'
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        cache_control = LEGACY_CACHE_CONTROL
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    # 本体の送信はプロキシに任せ、Pythonのワーカーはヘッダーだけ返す
+    if PHOTO_SENDFILE == "x-accel-redirect":
+        headers["X-Accel-Redirect"] = f"{PHOTO_ACCEL_REDIRECT_PREFIX}{served_filename}"
+        return Response(headers=headers)
+    if PHOTO_SENDFILE == "x-sendfile":
+        headers["X-Sendfile"] = file_path
+        return Response(headers=headers)
+    
+    # Rangeリクエストへの206応答はFileResponseが行う
+    return FileResponse(file_path, headers=headers, stat_result=stat_result)
 
 @router.delete("/photo/{photo_id}")
 async def delete_photo(
@@ -107,17 +201,17 @@ async def delete_photo(
         
         # ファイルパスを取得
         filename = photo.photo_url.split("/")[-1]  # URLからファイル名を抽出
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        
-        # DBから削除
-        await crud_recipe.delete_recipe_photo_by_id(db, photo_id)
         
-        # ファイルシステムから物理削除
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        # DBから削除し、最後の参照が消えた場合のみ保存先から物理削除（派生画像も含む）
+        remove_files = None
+        if photo.photo_url.startswith("/uploads/photos/"):
+            remove_files = lambda: services_storage.remove_photo(filename)
+        await crud_recipe.release_photo_file(db, photo.photo_url, photo_id=photo_id, remove_files=remove_files)
         
         return {"message": "Photo deleted successfully", "photo_id": photo_id}
         
+    except HTTPException:
+        raise
     except ValueError as e:
         if "not found" in str(e):
             raise HTTPException(status_code=404, detail=str(e))
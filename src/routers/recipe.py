@@ -1,28 +1,76 @@
-from fastapi import APIRouter, HTTPException, Path, Depends, Query, File, UploadFile, Form
+from fastapi import APIRouter, HTTPException, Path, Depends, Query, File, UploadFile, Form, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 import src.schemas.recipe as recipe_schema
 from src.cruds import recipe as crud_recipe
 import src.services.scrape as services_scrape
+import src.services.photo_fetch as services_photo_fetch
 import src.services.ocr as services_ocr
-from src.db import get_db
-from datetime import date
+from src.services.ocr_executor import OcrQueueFullError
+import src.services.ocr_jobs as services_ocr_jobs
+from src.services.cache import recipe_detail_cache, calendar_month_cache
+from src.services import http_cache
+from src.db import get_db, async_session
+from datetime import date, timedelta
 from typing import List, Optional
+import asyncio
+import httpx
 
 router = APIRouter()
 # 仮のDB（メモリ）
 recipes_db = []
+
+# 一覧取得のページサイズ
+RECIPE_PAGE_SIZE_DEFAULT = 20
+RECIPE_PAGE_SIZE_MAX = 100
+# 期間指定で取得できる最大日数（年カレンダー表示まで）
+DATE_RANGE_MAX_DAYS = 366
+# URL一括取り込みで受け付ける最大件数と、1トランザクションで登録する件数
+BULK_SCRAPE_MAX_URLS = 500
+BULK_INSERT_BATCH_SIZE = 50
+# 書籍写真の一括取り込みで受け付ける1ファイル・合計のサイズと、展開後の最大ページ数
+BOOK_PHOTO_MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+BOOK_PHOTO_MAX_TOTAL_SIZE = 200 * 1024 * 1024  # 200MB
+BOOK_PHOTO_MAX_PAGES = 100
     
+async def _check_recipes_not_modified(request: Request, response: Response, db: AsyncSession, *parts) -> Optional[Response]:
+    """一覧のETagを設定し、クライアントのキャッシュが最新なら304を返す
+
+    削除やタグの付け外しではupdated_atの最大値が変わらないため、
+    Last-Modified（If-Modified-Since）は使わず件数を含むETagだけで判定する
+    """
+    version = await crud_recipe.get_recipes_version(db)
+    etag = http_cache.make_etag(*parts, version)
+    if http_cache.is_not_modified(request, etag):
+        return http_cache.not_modified(etag)
+    response.headers.update(http_cache.validator_headers(etag))
+    return None
+
 @router.get("/recipes", response_model=List[recipe_schema.RecipeDetailResponse])
 async def read_recipe(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="次ページ取得用カーソル（X-Next-Cursorヘッダーの値）"),
+    limit: int = Query(RECIPE_PAGE_SIZE_DEFAULT, ge=1, le=RECIPE_PAGE_SIZE_MAX, description="取得件数"),
     db: AsyncSession = Depends(get_db)
 ):
-    """レシピ詳細全取得（全関連データ含む）"""
+    """レシピ詳細をページ単位で取得（全関連データ含む・新しい順）"""
     try:
-        # 修正されたget関数（Eager Loading対応）を使用
-        recipes = await crud_recipe.get_all_recipes(db)
+        position = crud_recipe.decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        if not recipes:
-            return []  # 空のリストを返す（404エラーではなく）
+    try:
+        not_modified = await _check_recipes_not_modified(request, response, db, "recipes", cursor, limit)
+        if not_modified is not None:
+            return not_modified
+
+        # 次ページの有無を判定するため1件多く取得
+        recipes = await crud_recipe.get_recipes_page(db, limit=limit + 1, cursor=position)
+
+        if len(recipes) > limit:
+            recipes = recipes[:limit]
+            response.headers["X-Next-Cursor"] = crud_recipe.encode_cursor(recipes[-1])
 
         return recipes
     except HTTPException:
@@ -30,6 +78,52 @@ async def read_recipe(
     except Exception as e:
         print(f"Error in read_recipe: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+async def _recipe_ndjson_lines(chunk_size: int):
+    """レシピをチャンク単位でDBから読み出し、1件ずつNDJSONの行として返す"""
+    # レスポンス送信中もセッションを保持する必要があるため、依存性注入とは別に開く
+    async with async_session() as db:
+        async for recipes in crud_recipe.iter_recipe_chunks(db, chunk_size):
+            for recipe in recipes:
+                yield recipe_schema.RecipeDetailResponse.model_validate(recipe).model_dump_json() + "\n"
+
+@router.get("/recipes/stream")
+async def stream_recipes(
+    chunk_size: int = Query(RECIPE_PAGE_SIZE_DEFAULT, ge=1, le=RECIPE_PAGE_SIZE_MAX, description="DBから一度に読み込む件数")
+):
+    """レシピ詳細全件をNDJSONでストリーミング配信"""
+    return StreamingResponse(_recipe_ndjson_lines(chunk_size), media_type="application/x-ndjson")
+
+@router.get("/recipes/summary", response_model=List[recipe_schema.RecipeListResponse])
+async def read_recipe_summaries(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="次ページ取得用カーソル（X-Next-Cursorヘッダーの値）"),
+    limit: int = Query(RECIPE_PAGE_SIZE_DEFAULT, ge=1, le=RECIPE_PAGE_SIZE_MAX, description="取得件数"),
+    db: AsyncSession = Depends(get_db)
+):
+    """レシピ一覧をページ単位で取得（一覧表示用の項目とメイン写真のみ）"""
+    try:
+        position = crud_recipe.decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        not_modified = await _check_recipes_not_modified(request, response, db, "recipes/summary", cursor, limit)
+        if not_modified is not None:
+            return not_modified
+
+        recipes = await crud_recipe.get_recipes_page(db, limit=limit + 1, cursor=position, summary=True)
+
+        if len(recipes) > limit:
+            recipes = recipes[:limit]
+            response.headers["X-Next-Cursor"] = crud_recipe.encode_cursor(recipes[-1])
+
+        return recipes
+    except Exception as e:
+        print(f"Error in read_recipe_summaries: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
 @router.get("/recipes/search", response_model=List[recipe_schema.RecipeDetailResponse])
 async def search_recipes(
     tag_ids: Optional[List[int]] = Query(None, description="タグIDで絞り込み"),
@@ -53,19 +147,93 @@ async def search_recipes(
     except Exception as e:
         print(f"Error in search_recipes: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+@router.get("/recipes/search/summary", response_model=List[recipe_schema.RecipeListResponse])
+async def search_recipe_summaries(
+    tag_ids: Optional[List[int]] = Query(None, description="タグIDで絞り込み"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="取得件数上限"),
+    sort_by_created_at: Optional[bool] = Query(False, description="作成日時でソートするか"),
+    sort_order: Optional[recipe_schema.SortOrder] = Query(recipe_schema.SortOrder.desc, description="ソート順"),
+    db: AsyncSession = Depends(get_db)
+):
+    """レシピを検索（一覧表示用の項目とメイン写真のみ）"""
+    try:
+        return await crud_recipe.search_recipes(
+            db=db,
+            tag_ids=tag_ids,
+            limit=limit,
+            sort_by_created_at=sort_by_created_at,
+            sort_order=sort_order,
+            summary=True
+        )
+    except Exception as e:
+        print(f"Error in search_recipe_summaries: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+def _validate_date_range(from_date: date, to_date: date) -> None:
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="'from' must be on or before 'to'")
+    if (to_date - from_date).days + 1 > DATE_RANGE_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range must not exceed {DATE_RANGE_MAX_DAYS} days")
+
+@router.get("/recipes/range", response_model=List[recipe_schema.RecipeDetailResponse])
+async def get_recipes_by_date_range(
+    from_date: date = Query(..., alias="from", description="開始日 (YYYY-MM-DD形式)"),
+    to_date: date = Query(..., alias="to", description="終了日 (YYYY-MM-DD形式、この日を含む)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """指定した期間に調理したレシピを全て取得（週・年カレンダー用）"""
+    _validate_date_range(from_date, to_date)
+    try:
+        return await crud_recipe.get_recipes_by_date_range(db, from_date, to_date + timedelta(days=1))
+    except Exception as e:
+        print(f"Error in get_recipes_by_date_range: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/recipes/range/summary", response_model=List[recipe_schema.RecipeListResponse])
+async def get_recipe_summaries_by_date_range(
+    from_date: date = Query(..., alias="from", description="開始日 (YYYY-MM-DD形式)"),
+    to_date: date = Query(..., alias="to", description="終了日 (YYYY-MM-DD形式、この日を含む)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """指定した期間に調理したレシピを全て取得（一覧表示用の項目とメイン写真のみ）"""
+    _validate_date_range(from_date, to_date)
+    try:
+        return await crud_recipe.get_recipes_by_date_range(db, from_date, to_date + timedelta(days=1), summary=True)
+    except Exception as e:
+        print(f"Error in get_recipe_summaries_by_date_range: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
 @router.get("/recipes/{recipe_id}", response_model=recipe_schema.RecipeDetailResponse)
 async def read_recipe(
+    request: Request,
     recipe_id: int = Path(..., description="Recipe ID"),
     db: AsyncSession = Depends(get_db)
 ):
     """レシピ詳細取得（全関連データ含む）"""
     try:
+        # 関連データを読み込まずに集計クエリだけで更新有無を判定
+        # （関連データの削除はupdated_atに表れないため、Last-Modifiedは使わずETagのみ）
+        version = await crud_recipe.get_recipe_version(db, recipe_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        etag = http_cache.make_etag("recipe", recipe_id, version)
+        if http_cache.is_not_modified(request, etag):
+            return http_cache.not_modified(etag)
+        headers = http_cache.validator_headers(etag)
+
+        cached = await recipe_detail_cache.get(recipe_id)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json", headers=headers)
+
+        token = await recipe_detail_cache.token(recipe_id)
         # 修正されたget関数（Eager Loading対応）を使用
         recipe = await crud_recipe.get_recipe_by_id(db, recipe_id)
         
         if recipe is None:
             raise HTTPException(status_code=404, detail="Recipe not found") 
-        return recipe
+
+        body = recipe_schema.RecipeDetailResponse.model_validate(recipe).model_dump_json().encode()
+        await recipe_detail_cache.set(recipe_id, body, token)
+        return Response(content=body, media_type="application/json", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -88,6 +256,18 @@ async def get_recipes_by_date(
         print(f"Error in get_recipes_by_date: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@router.get("/recipes/date/{cooking_date}/summary", response_model=List[recipe_schema.RecipeListResponse])
+async def get_recipe_summaries_by_date(
+    cooking_date: date = Path(..., description="調理日付 (YYYY-MM-DD形式)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """指定した日付に調理したレシピを全て取得（一覧表示用の項目とメイン写真のみ）"""
+    try:
+        return await crud_recipe.get_recipes_by_cooking_date(db, cooking_date, summary=True)
+    except Exception as e:
+        print(f"Error in get_recipe_summaries_by_date: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
 @router.get("/cooking-records/month/{month_string}", response_model=List[recipe_schema.RecipeDetailResponse])
 async def get_cooking_records_by_month(
     month_string: str = Path(..., description="年月 (YYYY-MM形式)", regex=r'^\d{4}-\d{2}$'),
@@ -109,7 +289,72 @@ async def get_cooking_records_by_month(
     except Exception as e:
         print(f"Error in get_cooking_records_by_month: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/cooking-records/month/{month_string}/summary", response_model=List[recipe_schema.RecipeListResponse])
+async def get_cooking_record_summaries_by_month(
+    month_string: str = Path(..., description="年月 (YYYY-MM形式)", regex=r'^\d{4}-\d{2}$'),
+    db: AsyncSession = Depends(get_db)
+):
+    """指定した年月に調理したレシピを全て取得（一覧表示用の項目とメイン写真のみ）"""
+    try:
+        year, month = map(int, month_string.split('-'))
+        return await crud_recipe.get_recipes_by_month(db, year, month, summary=True)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM format.")
+    except Exception as e:
+        print(f"Error in get_cooking_record_summaries_by_month: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
     
+async def _build_calendar(db: AsyncSession, start: date, end: date) -> dict:
+    records, recipes = await crud_recipe.get_calendar(db, start, end)
+    days = {}
+    for record in records:
+        days.setdefault(record.cooking_date, []).append(
+            {"cooking_record_id": record.id, "recipe_id": record.recipe_id}
+        )
+    return {"days": days, "recipes": {recipe.id: recipe for recipe in recipes}}
+
+@router.get("/calendar", response_model=recipe_schema.CalendarResponse)
+async def get_calendar(
+    from_date: date = Query(..., alias="from", description="開始日 (YYYY-MM-DD形式)"),
+    to_date: date = Query(..., alias="to", description="終了日 (YYYY-MM-DD形式、この日を含む)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """指定した期間のカレンダーを取得（日付ごとの調理記録と、各レシピ1件ずつの一覧情報）"""
+    _validate_date_range(from_date, to_date)
+    try:
+        return await _build_calendar(db, from_date, to_date + timedelta(days=1))
+    except Exception as e:
+        print(f"Error in get_calendar: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/calendar/month/{month_string}", response_model=recipe_schema.CalendarResponse)
+async def get_calendar_by_month(
+    month_string: str = Path(..., description="年月 (YYYY-MM形式)", regex=r'^\d{4}-\d{2}$'),
+    db: AsyncSession = Depends(get_db)
+):
+    """指定した年月のカレンダーを取得（日付ごとの調理記録と、各レシピ1件ずつの一覧情報）"""
+    try:
+        year, month = map(int, month_string.split('-'))
+        start, end = crud_recipe.month_range(year, month)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM format.")
+    try:
+        cached = await calendar_month_cache.get(month_string)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+        token = await calendar_month_cache.token(month_string)
+        calendar = recipe_schema.CalendarResponse.model_validate(
+            await _build_calendar(db, start, end), from_attributes=True
+        )
+        body = calendar.model_dump_json().encode()
+        await calendar_month_cache.set(month_string, body, token)
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        print(f"Error in get_calendar_by_month: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
 @router.post("/recipe/scrape", response_model=recipe_schema.RecipeDetailResponse)
 async def scrape_and_save_recipe(
     request: recipe_schema.RecipeScrapeRequest,
@@ -125,8 +370,88 @@ async def scrape_and_save_recipe(
         return complete_recipe 
     else:
         # スクレイピングを実行し、cooking_recordsにも登録する
-        scraped_data = services_scrape.scrape_recipe(request.source_url)
-        return await crud_recipe.create_from_scraped_data(db, scraped_data=scraped_data, cooking_date=request.cooking_date)
+        try:
+            scraped_data = await services_scrape.scrape_recipe(request.source_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except httpx.HTTPError as e:
+            print(f"Error fetching {request.source_url}: {e}")
+            raise HTTPException(status_code=502, detail=f"Failed to fetch recipe page: {str(e)}")
+        new_recipe = await crud_recipe.create_from_scraped_data(db, scraped_data=scraped_data, cooking_date=request.cooking_date)
+        # 外部サイトの画像はバックグラウンドで保存し、取得できたら写真のURLを付け替える
+        services_photo_fetch.schedule_localize(scraped_data["photo_url"])
+        return new_recipe
+
+@router.post("/recipe/scrape/bulk", response_model=recipe_schema.RecipeBulkScrapeResponse)
+async def bulk_scrape_and_save_recipes(
+    request: recipe_schema.RecipeBulkScrapeRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """複数URLのレシピを並行して取り込み、URLごとの結果を返す"""
+    if len(request.source_urls) > BULK_SCRAPE_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"Too many URLs (max {BULK_SCRAPE_MAX_URLS})")
+    try:
+        # リクエスト内の重複を除き、登録済みのURLは1回のクエリでまとめて判定
+        unique_urls = list(dict.fromkeys(request.source_urls))
+        existing = await crud_recipe.get_recipe_ids_by_source_urls(db, unique_urls)
+        outcomes = {
+            url: recipe_schema.RecipeBulkScrapeResult(
+                source_url=url, status=recipe_schema.BulkScrapeStatus.existing, recipe_id=recipe_id
+            )
+            for url, recipe_id in existing.items()
+        }
+        if existing:
+            # 単体の取り込みと同様、登録済みレシピには調理記録を追加する
+            await crud_recipe.create_many_from_scraped_data(
+                db, scraped_list=[], cooking_date=request.cooking_date, existing_recipe_ids=list(existing.values())
+            )
+
+        to_scrape = [url for url in unique_urls if url not in existing]
+        print(f"URL一括取り込み: {len(unique_urls)}件（登録済み{len(existing)}件）")
+        results = await services_scrape.scrape_recipes(to_scrape)
+
+        scraped = []
+        for url, result in zip(to_scrape, results):
+            if isinstance(result, Exception):
+                outcomes[url] = recipe_schema.RecipeBulkScrapeResult(
+                    source_url=url, status=recipe_schema.BulkScrapeStatus.failed, error=str(result) or type(result).__name__
+                )
+            else:
+                scraped.append((url, result))
+
+        for i in range(0, len(scraped), BULK_INSERT_BATCH_SIZE):
+            batch = scraped[i:i + BULK_INSERT_BATCH_SIZE]
+            try:
+                recipe_ids = await crud_recipe.create_many_from_scraped_data(
+                    db, scraped_list=[data for _, data in batch], cooking_date=request.cooking_date
+                )
+            except Exception as e:
+                for url, _ in batch:
+                    outcomes[url] = recipe_schema.RecipeBulkScrapeResult(
+                        source_url=url, status=recipe_schema.BulkScrapeStatus.failed, error=str(e)
+                    )
+                continue
+            for (url, data), recipe_id in zip(batch, recipe_ids):
+                outcomes[url] = recipe_schema.RecipeBulkScrapeResult(
+                    source_url=url, status=recipe_schema.BulkScrapeStatus.created, recipe_id=recipe_id
+                )
+                services_photo_fetch.schedule_localize(data["photo_url"])
+
+        # リクエストのURL順に結果を返す（2回目以降に出現したURLはduplicate）
+        seen = set()
+        response = []
+        for url in request.source_urls:
+            if url in seen:
+                response.append(outcomes[url].model_copy(update={"status": recipe_schema.BulkScrapeStatus.duplicate}))
+            else:
+                seen.add(url)
+                response.append(outcomes[url])
+        return {"results": response}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"URL一括取り込みエラー: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/recipe/book-photo", response_model=recipe_schema.RecipeDetailResponse)
 async def create_recipe_from_book_photo(
@@ -143,8 +468,8 @@ async def create_recipe_from_book_photo(
         # 画像ファイルの内容を読み取り
         image_content = await photo.read()
         
-        # OCRでレシピ情報を抽出
-        recipe_data = services_ocr.extract_recipe_from_book_photo(image_content)
+        # OCRでレシピ情報を抽出（専用プロセスプールで実行）
+        recipe_data = await services_ocr.extract_recipe_from_book_photo_async(image_content)
         
         # データベースにレシピを保存
         new_recipe = await crud_recipe.create_from_book_photo(
@@ -157,6 +482,9 @@ async def create_recipe_from_book_photo(
         
         return new_recipe
         
+    except OcrQueueFullError as e:
+        print(f"OCR待ち行列が満杯です: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
     except ValueError as e:
         print(f"OCRエラー: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -164,6 +492,105 @@ async def create_recipe_from_book_photo(
         print(f"書籍写真処理エラー: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@router.post("/recipe/book-photo/batch", response_model=recipe_schema.BookPhotoBatchResponse)
+async def create_recipes_from_book_photos(
+    photos: List[UploadFile] = File(..., description="書籍の写真（複数画像・zip・マルチページTIFF）"),
+    cooking_date: date = Form(..., description="調理日"),
+    source_book_title: str = Form(None, description="書籍タイトル"),
+    source_page: int = Form(None, description="最初のページ番号（以降は連番）"),
+    db: AsyncSession = Depends(get_db)
+):
+    """複数ページの書籍写真から並列にOCRを行い、レシピをまとめて作成"""
+    try:
+        pages = []
+        uploaded_size = 0
+        for photo in photos:
+            if photo.size is not None and photo.size > BOOK_PHOTO_MAX_FILE_SIZE:
+                raise HTTPException(status_code=413, detail="File too large")
+            data = await photo.read(BOOK_PHOTO_MAX_FILE_SIZE + 1)
+            uploaded_size += len(data)
+            if len(data) > BOOK_PHOTO_MAX_FILE_SIZE or uploaded_size > BOOK_PHOTO_MAX_TOTAL_SIZE:
+                raise HTTPException(status_code=413, detail="File too large")
+            # zipの展開・TIFFの分割はイベントループを止めないようスレッドで行う
+            pages.extend(await asyncio.to_thread(
+                services_ocr.expand_book_pages,
+                data,
+                BOOK_PHOTO_MAX_PAGES - len(pages),
+                BOOK_PHOTO_MAX_TOTAL_SIZE - sum(len(page) for page in pages),
+            ))
+        if not pages:
+            raise HTTPException(status_code=400, detail="No pages found in upload")
+        print(f"書籍写真を一括取り込み: {len(pages)}ページ")
+
+        source_pages = [source_page + i if source_page is not None else None for i in range(len(pages))]
+        results = await services_ocr.extract_recipes_from_book_pages_async(pages)
+
+        recipes_data, recipe_pages, errors = [], [], []
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                errors.append(recipe_schema.BookPhotoPageError(
+                    page_index=i, source_page=source_pages[i], error=str(result)
+                ))
+            else:
+                recipes_data.append(result)
+                recipe_pages.append(source_pages[i])
+
+        recipes = []
+        if recipes_data:
+            recipes = await crud_recipe.create_many_from_book_photos(
+                db,
+                recipes_data=recipes_data,
+                cooking_date=cooking_date,
+                source_book_title=source_book_title,
+                source_pages=recipe_pages
+            )
+        return {"recipes": recipes, "errors": errors}
+    except HTTPException:
+        raise
+    except services_ocr.BookPagesLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except OcrQueueFullError as e:
+        print(f"OCR待ち行列が満杯です: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    except Exception as e:
+        print(f"書籍写真一括処理エラー: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/recipe/book-photo/jobs", response_model=recipe_schema.OcrJobResponse, status_code=202)
+async def create_book_photo_job(
+    photo: UploadFile = File(..., description="書籍の写真"),
+    cooking_date: date = Form(..., description="調理日"),
+    source_book_title: str = Form(None, description="書籍タイトル"),
+    source_page: int = Form(None, description="ページ番号")
+):
+    """書籍写真からのレシピ作成ジョブを登録（OCR完了を待たずにジョブIDを返す）"""
+    print(f"書籍写真OCRジョブを登録: {photo.filename}")
+    try:
+        image_content = await photo.read()
+        job = await services_ocr_jobs.create_job(
+            image_content,
+            cooking_date=cooking_date,
+            source_book_title=source_book_title,
+            source_page=source_page
+        )
+        return recipe_schema.OcrJobResponse(**job.to_dict())
+    except services_ocr_jobs.OcrJobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except Exception as e:
+        print(f"OCRジョブ登録エラー: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/recipe/book-photo/jobs/{job_id}", response_model=recipe_schema.OcrJobResponse)
+async def get_book_photo_job(
+    job_id: str = Path(..., description="ジョブID", regex=r'^[0-9a-f]{32}$'),
+    wait: float = Query(0, ge=0, le=30, description="完了まで待つ最大秒数（ロングポーリング）")
+):
+    """書籍写真OCRジョブの状態を取得"""
+    job = await services_ocr_jobs.get_job(job_id, wait=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return recipe_schema.OcrJobResponse(**job.to_dict())
+
 @router.delete("/recipe/{recipe_id}", response_model=None)
 async def delete_recipe(
     recipe_id: int, db: AsyncSession = Depends(get_db)):
@@ -1,24 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from src.db import get_db
 from src.cruds import tag as tag_crud
 from src.schemas.recipe import TagResponse, TagCreate
+from src.services.cache import tag_list_cache
+from src.services import http_cache
 
 router = APIRouter()
 
+_tag_list_adapter = TypeAdapter(List[TagResponse])
+
+TAG_LIST_CACHE_KEY = "all"
+
 @router.get("/tags", response_model=List[TagResponse])
-async def get_all_tags(db: AsyncSession = Depends(get_db)):
+async def get_all_tags(request: Request, db: AsyncSession = Depends(get_db)):
     """全てのタグを取得"""
+    # タグの削除はupdated_atの最大値に表れないため、Last-Modifiedは使わず件数を含むETagのみ
+    version = await tag_crud.get_tags_version(db)
+    etag = http_cache.make_etag("tags", version)
+    if http_cache.is_not_modified(request, etag):
+        return http_cache.not_modified(etag)
+    headers = http_cache.validator_headers(etag)
+
+    cached = await tag_list_cache.get(TAG_LIST_CACHE_KEY)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json", headers=headers)
+
+    token = await tag_list_cache.token(TAG_LIST_CACHE_KEY)
     tags = await tag_crud.get_all_tags(db)
-    return tags
+    body = _tag_list_adapter.dump_json(_tag_list_adapter.validate_python(tags, from_attributes=True))
+    await tag_list_cache.set(TAG_LIST_CACHE_KEY, body, token)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/tags/{tag_id}", response_model=TagResponse)
-async def get_tag_by_id(tag_id: int, db: AsyncSession = Depends(get_db)):
+async def get_tag_by_id(tag_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """IDでタグを取得"""
     tag = await tag_crud.get_tag_by_id(db, tag_id)
     if tag is None:
         raise HTTPException(status_code=404, detail="Tag not found")
+
+    etag = http_cache.make_etag("tag", tag.id, tag.name, tag.updated_at)
+    if http_cache.is_not_modified(request, etag, tag.updated_at):
+        return http_cache.not_modified(etag, tag.updated_at)
+    response.headers.update(http_cache.validator_headers(etag, tag.updated_at))
     return tag
 
 @router.post("/tag", response_model=TagResponse)
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import date, datetime
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -7,6 +7,18 @@ class SortOrder(str, Enum):
     asc = "asc"
     desc = "desc"
 
+class BulkScrapeStatus(str, Enum):
+    created = "created"
+    existing = "existing"
+    duplicate = "duplicate"
+    failed = "failed"
+
+class OcrJobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
 # === Pydanticモデル（Response用）の定義 ===
 
 class SourceTypeResponse(BaseModel):
@@ -160,11 +172,46 @@ class RecipeScrapeRequest(BaseModel):
     source_url: str
     cooking_date: date
 
+class RecipeBulkScrapeRequest(BaseModel):
+    source_urls: List[str] = Field(..., min_length=1)
+    cooking_date: date
+
+class RecipeBulkScrapeResult(BaseModel):
+    """一括取り込みのURLごとの結果"""
+    source_url: str
+    status: BulkScrapeStatus
+    recipe_id: Optional[int] = None
+    error: Optional[str] = None
+
+class RecipeBulkScrapeResponse(BaseModel):
+    """URL一括取り込みの結果（リクエストのURL順）"""
+    results: List[RecipeBulkScrapeResult] = []
+
 class RecipeBookPhotoRequest(BaseModel):
     cooking_date: date
     source_book_title: Optional[str] = None
     source_page: Optional[int] = None
 
+class OcrJobResponse(BaseModel):
+    """書籍写真OCRジョブの状態"""
+    job_id: str
+    status: OcrJobStatus
+    recipe_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+class BookPhotoPageError(BaseModel):
+    """一括取り込みで失敗したページ"""
+    page_index: int
+    source_page: Optional[int] = None
+    error: str
+
+class BookPhotoBatchResponse(BaseModel):
+    """書籍写真一括取り込みの結果"""
+    recipes: List[RecipeDetailResponse] = []
+    errors: List[BookPhotoPageError] = []
+
 class RecipeSearchRequest(BaseModel):
     tag_ids: Optional[List[int]] = None
     limit: Optional[int] = Field(None, ge=1, le=100)
@@ -351,6 +398,16 @@ class RecipeListResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CalendarEntry(BaseModel):
+    """カレンダーの1日分に含まれる調理記録"""
+    cooking_record_id: int
+    recipe_id: int
+
+class CalendarResponse(BaseModel):
+    """カレンダー表示用レスポンス（日付ごとの調理記録と、重複のないレシピ辞書）"""
+    days: Dict[date, List[CalendarEntry]] = {}
+    recipes: Dict[int, RecipeListResponse] = {}
+
 class RecipeCreate(BaseModel):
     name: int
     ingredients: List[str]
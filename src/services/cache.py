@@ -0,0 +1,293 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from os import environ
+from typing import Dict, List, Optional, Tuple
+from src.services.metrics import metrics
+
+# キャッシュバックエンドの選択（memory: プロセス内 / redis: ワーカー間で共有）
+CACHE_BACKEND = environ.get("CACHE_BACKEND", "memory")
+REDIS_URL = environ.get("REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = environ.get("CACHE_KEY_PREFIX", "cooking-memo")
+# プロセス内キャッシュの最大件数
+MEMORY_CACHE_MAX_ENTRIES = int(environ.get("MEMORY_CACHE_MAX_ENTRIES", environ.get("RECIPE_CACHE_MAX_ENTRIES", "1000")))
+# レスポンス種別ごとの有効期限（秒）
+RECIPE_CACHE_TTL = float(environ.get("RECIPE_CACHE_TTL", "300"))
+TAG_CACHE_TTL = float(environ.get("TAG_CACHE_TTL", "600"))
+CALENDAR_CACHE_TTL = float(environ.get("CALENDAR_CACHE_TTL", "300"))
+# 無効化マーカーの保持期間（読み込み中の古い値の書き戻し防止用）
+INVALIDATION_MARKER_TTL = 3600
+# バックエンドの障害でトークンを取得できなかったことを表す値（実際のトークンとは一致しない）
+UNAVAILABLE_TOKEN = (b"", b"")
+
+class CacheBackend(ABC):
+    """キャッシュバックエンドのインターフェース（値はbytes、キーはstr）
+
+    errorsはバックエンドの障害として扱う例外（ResponseCacheは握りつぶしてキャッシュなしで動く）
+    """
+
+    errors: Tuple[type, ...] = (OSError,)
+
+    @abstractmethod
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        ...
+
+    @abstractmethod
+    async def set_if_unchanged(
+        self, key: str, value: bytes, ttl: float, watch_keys: List[str], expected: List[bytes]
+    ) -> bool:
+        """watch_keysの値（未設定はb"0"）がexpectedと一致する場合のみ書き込む（確認と書き込みは不可分）"""
+
+    async def close(self) -> None:
+        pass
+
+class MemoryCacheBackend(CacheBackend):
+    """プロセス内の有効期限付きLRUキャッシュ
+
+    incr()のカウンタ（世代番号・無効化マーカー）はLRUの追い出し対象にしない
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._counters: Dict[str, Tuple[Optional[float], int]] = {}
+
+    def _get_counter(self, key: str) -> Optional[int]:
+        entry = self._counters.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._counters[key]
+            return None
+        return value
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            metrics.inc("cache.memory.evictions")
+        metrics.set_gauge("cache.memory.entries", len(self._entries))
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        values = []
+        for key in keys:
+            counter = self._get_counter(key)
+            values.append(str(counter).encode() if counter is not None else self._get(key))
+        return values
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._put(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        value = (self._get_counter(key) or 0) + 1
+        self._counters[key] = (time.monotonic() + ttl if ttl else None, value)
+        return value
+
+    async def set_if_unchanged(
+        self, key: str, value: bytes, ttl: float, watch_keys: List[str], expected: List[bytes]
+    ) -> bool:
+        # 途中でawaitしないため、イベントループ上で確認と書き込みの間に他の処理は割り込まない
+        current = [str(self._get_counter(watch_key) or 0).encode() for watch_key in watch_keys]
+        if current != list(expected):
+            return False
+        self._put(key, value, ttl)
+        return True
+
+# KEYS[1]: 書き込むキー、KEYS[2..]: 確認するキー
+# ARGV[1]: 値、ARGV[2]: 有効期限（ミリ秒）、ARGV[3..]: 確認するキーの期待値
+SET_IF_UNCHANGED_SCRIPT = """
+for i = 2, #KEYS do
+    if (redis.call('GET', KEYS[i]) or '0') ~= ARGV[i + 1] then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+
+class RedisCacheBackend(CacheBackend):
+    """Redisプロトコル互換サーバーを使うキャッシュ（全ワーカーで共有）"""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        self._client = redis.from_url(url)
+        self.errors = (redis.RedisError, OSError)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self._client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def set_if_unchanged(
+        self, key: str, value: bytes, ttl: float, watch_keys: List[str], expected: List[bytes]
+    ) -> bool:
+        stored = await self._client.eval(
+            SET_IF_UNCHANGED_SCRIPT, 1 + len(watch_keys), key, *watch_keys, value, int(ttl * 1000), *expected
+        )
+        return bool(stored)
+
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            if ttl:
+                pipe.expire(key, int(ttl))
+            value, *_ = await pipe.execute()
+        return value
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+def create_backend() -> CacheBackend:
+    if CACHE_BACKEND == "redis":
+        return RedisCacheBackend(REDIS_URL)
+    if CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(MEMORY_CACHE_MAX_ENTRIES)
+    raise ValueError(f"Unknown CACHE_BACKEND: {CACHE_BACKEND}")
+
+class ResponseCache:
+    """シリアライズ済みレスポンスの名前空間付きキャッシュ
+
+    - delete(key): そのキーを無効化（無効化マーカーを進めて値を削除）
+    - clear(): 名前空間の世代番号を進めて全キーを無効化
+    バックエンドがRedisの場合、無効化は全ワーカーに即座に反映される。
+    DB読み込み中に無効化が起きた場合に古い値を書き戻さないよう、
+    読み込み前にtoken()を取得してset()に渡す。
+    バックエンドの障害時は読み込みはミス、書き込み・無効化は省略して処理を続ける
+    （無効化できなかった値はTTLまで残り得る）
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, ttl: float):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        base = f"{CACHE_KEY_PREFIX}:{namespace}"
+        self._generation_key = f"{base}:gen"
+        self._value_prefix = f"{base}:v:"
+        self._marker_prefix = f"{base}:inv:"
+
+    def _backend_error(self, operation: str, error: Exception) -> None:
+        print(f"キャッシュの{operation}に失敗しました ({self.namespace}): {error}")
+        metrics.inc(f"cache.{self.namespace}.errors")
+
+    async def get(self, key) -> Optional[bytes]:
+        try:
+            generation, stored = await self.backend.mget([self._generation_key, f"{self._value_prefix}{key}"])
+        except self.backend.errors as e:
+            self._backend_error("get", e)
+            metrics.inc(f"cache.{self.namespace}.misses")
+            return None
+        if stored is not None:
+            # 値は「世代番号:本体」の形式で保存している
+            stored_generation, _, value = stored.partition(b":")
+            if stored_generation == (generation or b"0"):
+                metrics.inc(f"cache.{self.namespace}.hits")
+                return value
+        metrics.inc(f"cache.{self.namespace}.misses")
+        return None
+
+    async def token(self, key) -> Tuple[bytes, bytes]:
+        """set()に渡すトークン（取得できない場合はset()で書き込まれないUNAVAILABLE_TOKEN）"""
+        try:
+            generation, marker = await self.backend.mget([self._generation_key, f"{self._marker_prefix}{key}"])
+        except self.backend.errors as e:
+            self._backend_error("token", e)
+            return UNAVAILABLE_TOKEN
+        return generation or b"0", marker or b"0"
+
+    async def set(self, key, value: bytes, token: Optional[Tuple[bytes, bytes]] = None) -> None:
+        if token == UNAVAILABLE_TOKEN:
+            return
+        try:
+            if token is None:
+                token = await self.token(key)
+                if token == UNAVAILABLE_TOKEN:
+                    return
+            # 世代番号・無効化マーカーがtoken取得時から変わっていない場合のみ書き込む
+            stored = await self.backend.set_if_unchanged(
+                f"{self._value_prefix}{key}", token[0] + b":" + value, self.ttl,
+                [self._generation_key, f"{self._marker_prefix}{key}"], list(token),
+            )
+            if not stored:
+                metrics.inc(f"cache.{self.namespace}.stale_writes")
+        except self.backend.errors as e:
+            self._backend_error("set", e)
+
+    async def delete(self, key) -> None:
+        try:
+            await self.backend.incr(f"{self._marker_prefix}{key}", INVALIDATION_MARKER_TTL)
+            await self.backend.delete(f"{self._value_prefix}{key}")
+        except self.backend.errors as e:
+            self._backend_error("delete", e)
+
+    async def clear(self) -> None:
+        try:
+            await self.backend.incr(self._generation_key)
+        except self.backend.errors as e:
+            self._backend_error("clear", e)
+
+cache_backend = create_backend()
+
+# レシピ詳細（RecipeDetailResponseのJSON）をレシピIDで保持
+recipe_detail_cache = ResponseCache(cache_backend, "recipe_detail", RECIPE_CACHE_TTL)
+# タグ一覧
+tag_list_cache = ResponseCache(cache_backend, "tag_list", TAG_CACHE_TTL)
+# 月別カレンダー（CalendarResponseのJSON）を"YYYY-MM"で保持
+calendar_month_cache = ResponseCache(cache_backend, "calendar_month", CALENDAR_CACHE_TTL)
+
+async def invalidate_recipe(recipe_id: int) -> None:
+    """レシピの内容が変わった場合の無効化（レシピを含み得るカレンダーも全て無効化）"""
+    await recipe_detail_cache.delete(recipe_id)
+    await calendar_month_cache.clear()
+
+async def invalidate_cooking_record(recipe_id: int, cooking_date) -> None:
+    """調理記録の追加・削除時の無効化"""
+    await recipe_detail_cache.delete(recipe_id)
+    await calendar_month_cache.delete(cooking_date.strftime("%Y-%m"))
+
+async def invalidate_new_recipe(cooking_date) -> None:
+    """レシピ新規作成時の無効化（該当月のカレンダーのみ）"""
+    await calendar_month_cache.delete(cooking_date.strftime("%Y-%m"))
+
+async def invalidate_tags() -> None:
+    """タグの作成・更新・削除時の無効化（タグ名は各レシピ詳細・カレンダーに含まれる）"""
+    await tag_list_cache.clear()
+    await recipe_detail_cache.clear()
+    await calendar_month_cache.clear()
+
+async def close_cache() -> None:
+    await cache_backend.close()
@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from src.services.metrics import metrics
+
+# 追い出し時はこの割合まで減らす（上限付近で毎回追い出しが走らないように）
+EVICTION_LOW_WATERMARK = 0.9
+ENTRY_SUFFIX = ".entry"
+
+@dataclass
+class DiskCacheEntry:
+    key: str
+    value: bytes
+    meta: dict = field(default_factory=dict)
+    stored_at: float = 0.0
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+class DiskCache:
+    """ディスク上の永続キャッシュ（ワーカー間・再起動後も共有）
+
+    1エントリ1ファイルで、先頭行にJSONのヘッダー（キー・付加情報・保存時刻）、以降に値のバイト列を置く。
+    合計サイズがmax_bytesを超えたら最終参照（mtime）の古い順に削除する。
+    ttlを過ぎたエントリも再検証用に読めるので、鮮度はis_fresh()で判定する
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl: Optional[float] = None, name: str = "disk_cache"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.name = name
+        self._total_bytes: Optional[int] = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ENTRY_SUFFIX)
+
+    def _entry_paths(self) -> Iterator[str]:
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(ENTRY_SUFFIX):
+                        yield entry.path
+        except FileNotFoundError:
+            return
+
+    @staticmethod
+    def _read(path: str) -> Optional[DiskCacheEntry]:
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                value = f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+        return DiskCacheEntry(key=header["key"], value=value, meta=header.get("meta", {}), stored_at=header["stored_at"])
+
+    def _get(self, key: str) -> Optional[DiskCacheEntry]:
+        path = self._path(key)
+        entry = self._read(path)
+        if entry is None or entry.key != key:
+            return None
+        try:
+            # 参照時刻を更新（追い出し順に使う）
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry
+
+    def _set(self, key: str, value: bytes, meta: Optional[dict] = None) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        header = json.dumps({"key": key, "meta": meta or {}, "stored_at": time.time()}, ensure_ascii=False)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header.encode() + b"\n")
+            f.write(value)
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += os.path.getsize(path) - previous_size
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _delete(self, key: str) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+            self._total_bytes = None
+
+    def _scan_size(self) -> int:
+        return sum(os.path.getsize(path) for path in self._entry_paths())
+
+    def _evict(self) -> None:
+        """最終参照の古いエントリから削除して合計サイズを下げる"""
+        files = []
+        for path in self._entry_paths():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * EVICTION_LOW_WATERMARK
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            metrics.inc(f"{self.name}.evictions")
+        self._total_bytes = total
+
+    def is_fresh(self, entry: DiskCacheEntry) -> bool:
+        return self.ttl is None or entry.age < self.ttl
+
+    async def get(self, key: str) -> Optional[DiskCacheEntry]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, meta: Optional[dict] = None) -> None:
+        await asyncio.to_thread(self._set, key, value, meta)
+
+    async def touch(self, key: str, entry: DiskCacheEntry) -> None:
+        """再検証で変更がなかったエントリの保存時刻を更新（TTLを延長）"""
+        await asyncio.to_thread(self._set, key, entry.value, entry.meta)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    def iter_entries(self) -> Iterator[DiskCacheEntry]:
+        """全エントリを順に読む（オフラインでの再処理用、同期API）"""
+        for path in self._entry_paths():
+            entry = self._read(path)
+            if entry is not None:
+                yield entry
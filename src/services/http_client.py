@@ -0,0 +1,144 @@
+import asyncio
+import ipaddress
+import socket
+import httpx
+from contextlib import asynccontextmanager
+from os import environ
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlparse
+
+# 外部サイト取得用の共有HTTPクライアント設定
+HTTP_CONNECT_TIMEOUT = float(environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(environ.get("HTTP_READ_TIMEOUT", "15"))
+HTTP_MAX_CONNECTIONS = int(environ.get("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(environ.get("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_PER_DOMAIN_LIMIT = int(environ.get("HTTP_PER_DOMAIN_LIMIT", "4"))
+USER_AGENT = "cooking-memo/0.1 (+recipe import)"
+# リダイレクトを辿る最大回数と、fetch()で読み込むレスポンス本体の上限
+HTTP_MAX_REDIRECTS = int(environ.get("HTTP_MAX_REDIRECTS", "5"))
+HTTP_MAX_RESPONSE_SIZE = int(environ.get("HTTP_MAX_RESPONSE_SIZE", 5 * 1024 * 1024))
+
+class BlockedURLError(ValueError):
+    """取得を許可しないURL（http/https以外、内部ネットワーク宛て）"""
+
+class ResponseTooLargeError(ValueError):
+    """レスポンス本体が上限を超えている"""
+
+_client: Optional[httpx.AsyncClient] = None
+_domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+def get_client() -> httpx.AsyncClient:
+    """プロセス内で共有するHTTPクライアントを取得（keep-aliveで接続を再利用）"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            headers={"User-Agent": USER_AGENT},
+            # リダイレクト先も検査するため自動では辿らない（_send()で1回ずつ辿る）
+            follow_redirects=False,
+        )
+    return _client
+
+def _domain_semaphore(url: str) -> asyncio.Semaphore:
+    """ドメインごとの同時接続数を制限するセマフォ"""
+    domain = urlparse(url).netloc.lower()
+    semaphore = _domain_semaphores.get(domain)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(HTTP_PER_DOMAIN_LIMIT)
+        _domain_semaphores[domain] = semaphore
+    return semaphore
+
+async def _resolve_host(host: str, port: int) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+async def ensure_public_url(url: str) -> None:
+    """
+    外部サイトとして取得してよいURLか検査する（BlockedURLError）
+
+    http/httpsのみ許可し、ホスト名の解決先にプライベート・ループバック・リンクローカル等の
+    グローバルでないアドレスが1つでも含まれる場合は拒否する
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise BlockedURLError(f"URL not allowed: {url}")
+    try:
+        addresses = await _resolve_host(parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80))
+    except (socket.gaierror, UnicodeError) as e:
+        raise BlockedURLError(f"Cannot resolve host {parsed.hostname}: {e}") from e
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+            ip = ip.ipv4_mapped
+        if not ip.is_global:
+            raise BlockedURLError(f"URL not allowed (non-public address): {url}")
+
+@asynccontextmanager
+async def _send(url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    """
+    GETを送り、本体を読む前のレスポンスを返す
+
+    リダイレクトは宛先のURLを検査しながらHTTP_MAX_REDIRECTS回まで辿る。
+    ドメインごとの同時接続数を守る
+    """
+    client = get_client()
+    request = client.build_request("GET", url, **kwargs)
+    for _ in range(HTTP_MAX_REDIRECTS + 1):
+        await ensure_public_url(str(request.url))
+        async with _domain_semaphore(str(request.url)):
+            response = await client.send(request, stream=True)
+            try:
+                if not response.has_redirect_location:
+                    yield response
+                    return
+                request = response.next_request
+            finally:
+                await response.aclose()
+    raise httpx.TooManyRedirects(f"Exceeded {HTTP_MAX_REDIRECTS} redirects: {url}", request=request)
+
+async def fetch(
+    url: str, *, allow_not_modified: bool = False, max_size: int = HTTP_MAX_RESPONSE_SIZE, **kwargs
+) -> httpx.Response:
+    """ドメインごとの同時接続数を守りつつURLを取得（2xx以外はhttpx.HTTPStatusError）
+
+    条件付きリクエストで再検証する場合はallow_not_modified=Trueにすると304をそのまま返す。
+    本体がmax_sizeを超える場合はResponseTooLargeError、内部ネットワーク宛てはBlockedURLError
+    """
+    async with _send(url, **kwargs) as response:
+        if not (allow_not_modified and response.status_code == 304):
+            response.raise_for_status()
+        content_length = response.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_size:
+            raise ResponseTooLargeError(f"Response too large: {url}")
+        chunks, size = [], 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > max_size:
+                raise ResponseTooLargeError(f"Response too large: {url}")
+            chunks.append(chunk)
+    # 本体は展開済みなので、圧縮・長さのヘッダーを除いて組み立て直す
+    headers = [
+        (name, value) for name, value in response.headers.multi_items()
+        if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+    ]
+    return httpx.Response(response.status_code, headers=headers, content=b"".join(chunks), request=response.request)
+
+@asynccontextmanager
+async def stream(url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    """fetch()のストリーミング版（本体をメモリに溜めずに読む場合。サイズの上限は呼び出し側で守る）"""
+    async with _send(url, **kwargs) as response:
+        response.raise_for_status()
+        yield response
+
+async def close_client() -> None:
+    """共有HTTPクライアントを閉じる（アプリ終了時）"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from os import environ
+from typing import Dict, Iterable, Optional, Tuple
+from PIL import ExifTags, Image, ImageOps
+from src.services.metrics import metrics
+
+# 派生画像の長辺サイズ（px）と出力形式
+PHOTO_DERIVATIVE_SIZES = tuple(
+    int(size) for size in environ.get("PHOTO_DERIVATIVE_SIZES", "200,800").split(",")
+)
+PHOTO_DERIVATIVE_FORMAT = environ.get("PHOTO_DERIVATIVE_FORMAT", "webp").lower()
+PHOTO_DERIVATIVE_QUALITY = int(environ.get("PHOTO_DERIVATIVE_QUALITY", "80"))
+PHOTO_WORKERS = int(environ.get("PHOTO_WORKERS", min(2, os.cpu_count() or 1)))
+
+_FORMAT_EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def derivative_filename(stem: str, size: int) -> str:
+    """派生画像のファイル名（例: <sha256>_200.webp）"""
+    return f"{stem}_{size}{_FORMAT_EXTENSIONS[PHOTO_DERIVATIVE_FORMAT]}"
+
+def select_derivative_size(requested: int) -> Optional[int]:
+    """要求サイズ以上で最小の派生サイズ（該当なしは原寸を意味するNone）"""
+    candidates = [size for size in sorted(PHOTO_DERIVATIVE_SIZES) if size >= requested]
+    return candidates[0] if candidates else None
+
+def _prepare_for_encoding(image: Image.Image) -> Image.Image:
+    if PHOTO_DERIVATIVE_FORMAT == "jpeg":
+        return image.convert("RGB")
+    if image.mode not in ("RGB", "RGBA"):
+        return image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+    return image
+
+def _oriented_size(image: Image.Image) -> Tuple[int, int]:
+    """EXIFの回転情報を反映した画像サイズ（デコードせずヘッダーのみで判定）"""
+    width, height = image.size
+    # 5〜8は90度回転を含む
+    if image.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+def generate_derivatives(
+    source_path: str, output_dir: str, stem: str, sizes: Optional[Iterable[int]] = None
+) -> Tuple[int, int, Dict[int, str], Dict[int, str]]:
+    """
+    元画像からサイズ別の派生画像を生成する（画像処理ワーカープロセスで実行）
+
+    sizesで生成するサイズを絞れる（保存済みの派生画像は再生成しない）。
+    生成対象がなければ画像ヘッダーから解像度だけを読む。
+    書きかけのファイルが配信されないよう、派生画像はoutput_dir上の一時ファイルに書き出す
+    （呼び出し側でPhotoStorage.put_file()により確定する）
+
+    Returns:
+        (元画像の幅, 元画像の高さ, {長辺サイズ: 派生画像のファイル名}, {長辺サイズ: 生成した一時ファイルのパス})
+        ※ファイル名は全サイズ分、一時ファイルは生成したサイズ分
+    """
+    sizes = sorted(PHOTO_DERIVATIVE_SIZES if sizes is None else sizes)
+    filenames = {size: derivative_filename(stem, size) for size in sorted(PHOTO_DERIVATIVE_SIZES)}
+    if not sizes:
+        with Image.open(source_path) as opened:
+            width, height = _oriented_size(opened)
+        return width, height, filenames, {}
+
+    temp_paths: Dict[int, str] = {}
+    try:
+        with Image.open(source_path) as opened:
+            # スマートフォン写真の回転情報を反映
+            image = _prepare_for_encoding(ImageOps.exif_transpose(opened))
+            width, height = image.size
+
+            for size in sizes:
+                resized = image.copy()
+                resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+                fd, temp_paths[size] = tempfile.mkstemp(dir=output_dir, prefix=".", suffix=f".{filenames[size]}.tmp")
+                with os.fdopen(fd, "wb") as f:
+                    resized.save(f, format=PHOTO_DERIVATIVE_FORMAT.upper(), quality=PHOTO_DERIVATIVE_QUALITY)
+    except Exception:
+        for path in temp_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return width, height, filenames, temp_paths
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=PHOTO_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+async def generate_derivatives_async(
+    source_path: str, output_dir: str, stem: str, sizes: Optional[Iterable[int]] = None
+) -> Tuple[int, int, Dict[int, str], Dict[int, str]]:
+    """派生画像の生成を画像処理用プロセスプールで実行"""
+    loop = asyncio.get_running_loop()
+    sizes = None if sizes is None else list(sizes)
+    with metrics.timer("photo.derivatives"):
+        return await loop.run_in_executor(_get_pool(), generate_derivatives, source_path, output_dir, stem, sizes)
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
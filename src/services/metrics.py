@@ -0,0 +1,70 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict
+
+# 直近の計測値をパーセンタイル計算用に保持する件数
+TIMING_WINDOW = 1024
+
+class _Timing:
+    """処理時間の集計（件数・合計・最大・直近のp95）"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=TIMING_WINDOW)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def snapshot(self) -> dict:
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p95_ms": round(p95 * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+class Metrics:
+    """プロセス内のメトリクス（カウンタ・ゲージ・処理時間）"""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+        self.timings: Dict[str, _Timing] = {}
+
+    def inc(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = _Timing()
+        timing.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """withブロックの処理時間を計測"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "timings": {name: timing.snapshot() for name, timing in self.timings.items()},
+        }
+
+metrics = Metrics()
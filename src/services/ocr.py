@@ -1,35 +1,215 @@
 import cv2
-import pytesseract
 from PIL import Image
 import numpy as np
 import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
+import copy
+import hashlib
 import io
+import time
+import unicodedata
+import zipfile
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from os import environ
+from PIL import ImageSequence
+from src.services.disk_cache import DiskCache
+from src.services.metrics import metrics
+from src.services.ocr_engine import OCR_REGION_THREADS, get_engine
+from src.services.ocr_executor import ocr_executor
+
+# 前処理後の画像の長辺（px）。A5程度の紙面で約300dpiになる大きさ
+OCR_TARGET_LONG_EDGE = int(environ.get("OCR_TARGET_LONG_EDGE", "2400"))
+# これより多くの領域が検出された場合はノイズとみなしてページ全体を認識する
+OCR_MAX_REGIONS = int(environ.get("OCR_MAX_REGIONS", "30"))
+# 傾き補正で探索する最大角度（度）と、補正を省略する小さな傾き
+DESKEW_MAX_ANGLE = 10.0
+DESKEW_MIN_ANGLE = 0.3
+# 傾き推定に使う縮小画像の長辺
+DESKEW_SAMPLE_EDGE = 800
+# ページ面積に対してこれより小さい領域は無視する
+MIN_REGION_AREA_RATIO = 0.002
+# ページの高さに対してこれより低い領域は1行として認識する
+SINGLE_LINE_HEIGHT_RATIO = 0.035
+# ページの幅に対してこれより広い横方向の隙間を段組みの区切りとみなす（段の幅はCOLUMN_MIN_WIDTH_RATIO以上）
+COLUMN_GAP_RATIO = 0.04
+COLUMN_MIN_WIDTH_RATIO = 0.2
+# OCR結果のキャッシュ（画像のSHA-256がキー）
+OCR_CACHE_DIR = environ.get("OCR_CACHE_DIR", "/workspace/uploads/ocr_cache")
+OCR_CACHE_MAX_BYTES = int(environ.get("OCR_CACHE_MAX_MB", "100")) * 1024 * 1024
+# 前処理・認識の変更で抽出テキストが変わる場合に上げる（キャッシュ済みのテキストを使わなくなる）
+OCR_PIPELINE_VERSION = 2
+
+ocr_cache = DiskCache(OCR_CACHE_DIR, OCR_CACHE_MAX_BYTES, name="ocr_cache")
+
+def _decode_downscaled(image_data: bytes) -> np.ndarray:
+    """グレースケールで読み込み、長辺がOCR_TARGET_LONG_EDGE以下になるよう縮小する
+
+    大きな写真はデコード時点で1/2・1/4に縮小して読み込む（JPEGでは大幅に速い）
+    """
+    with Image.open(io.BytesIO(image_data)) as header:
+        long_edge = max(header.size)
+    if long_edge >= OCR_TARGET_LONG_EDGE * 4:
+        flags = cv2.IMREAD_REDUCED_GRAYSCALE_4
+    elif long_edge >= OCR_TARGET_LONG_EDGE * 2:
+        flags = cv2.IMREAD_REDUCED_GRAYSCALE_2
+    else:
+        flags = cv2.IMREAD_GRAYSCALE
+    gray = cv2.imdecode(np.frombuffer(image_data, np.uint8), flags)
+    if gray is None:
+        raise ValueError("画像を読み込めませんでした")
+
+    scale = OCR_TARGET_LONG_EDGE / max(gray.shape)
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray
+
+def _rotate(image: np.ndarray, angle: float, interpolation: int, border_mode: int) -> np.ndarray:
+    h, w = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(image, matrix, (w, h), flags=interpolation, borderMode=border_mode)
+
+def _estimate_skew(gray: np.ndarray) -> float:
+    """
+    文字行が水平になる回転角（度）を推定する
+
+    縮小した二値画像を回転させ、行ごとの黒画素数（水平投影）の分散が最大になる角度を
+    粗い刻みから細かい刻みの順に探す
+    """
+    scale = min(1.0, DESKEW_SAMPLE_EDGE / max(gray.shape))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+
+    def score(angle: float) -> float:
+        rotated = _rotate(ink, angle, cv2.INTER_NEAREST, cv2.BORDER_CONSTANT)
+        return float(np.var(rotated.sum(axis=1, dtype=np.float64)))
+
+    best = max(np.arange(-DESKEW_MAX_ANGLE, DESKEW_MAX_ANGLE + 1, 1.0), key=score)
+    return float(max(np.arange(best - 1.0, best + 1.01, 0.2), key=score))
 
 def preprocess_image(image_data: bytes) -> np.ndarray:
     """
     画像を前処理してOCRの精度を向上させる
+
+    目標解像度への縮小 → 傾き補正 → ノイズ除去 → 二値化（文字が黒、背景が白）
     """
-    # バイト配列から画像を読み込み
-    nparr = np.frombuffer(image_data, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-    # グレースケール変換
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
+    gray = _decode_downscaled(image_data)
+
+    # 傾き補正
+    angle = _estimate_skew(gray)
+    if abs(angle) >= DESKEW_MIN_ANGLE:
+        gray = _rotate(gray, angle, cv2.INTER_LINEAR, cv2.BORDER_REPLICATE)
+
     # ノイズ除去
     denoised = cv2.medianBlur(gray, 3)
-    
+
     # 二値化（適応的閾値処理）
-    binary = cv2.adaptiveThreshold(
+    return cv2.adaptiveThreshold(
         denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
     )
-    
-    # モルフォロジー変換でテキストを強調
-    kernel = np.ones((1, 1), np.uint8)
-    processed = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
-    
-    return processed
+
+def detect_text_regions(processed_image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    前処理済み画像から文字のまとまり（タイトル・材料欄・手順欄など）を検出する
+
+    文字を横長のカーネルで膨張させて段落単位の塊にし、その外接矩形(x, y, w, h)を
+    読む順（段組みは左の段から、各段の中は上から）に返す
+    """
+    h, w = processed_image.shape
+    ink = cv2.bitwise_not(processed_image)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(1, w // 50), max(1, h // 80)))
+    blocks = cv2.dilate(ink, kernel)
+    contours, _ = cv2.findContours(blocks, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = w * h * MIN_REGION_AREA_RATIO
+    regions = [rect for rect in (cv2.boundingRect(contour) for contour in contours) if rect[2] * rect[3] >= min_area]
+    return _reading_order(regions, max(1, int(w * COLUMN_GAP_RATIO)), int(w * COLUMN_MIN_WIDTH_RATIO))
+
+def _split_runs(regions: List[Tuple[int, int, int, int]], axis: int, gap: int) -> List[List[Tuple[int, int, int, int]]]:
+    """領域をaxis方向（0: x、1: y）の範囲が重なる、または隙間がgap未満のまとまりに分ける"""
+    runs: List[List[Tuple[int, int, int, int]]] = []
+    end = None
+    for rect in sorted(regions, key=lambda rect: rect[axis]):
+        start = rect[axis]
+        if end is not None and start < end + gap:
+            runs[-1].append(rect)
+            end = max(end, start + rect[axis + 2])
+        else:
+            runs.append([rect])
+            end = start + rect[axis + 2]
+    return runs
+
+def _run_extent(run: List[Tuple[int, int, int, int]]) -> Tuple[int, int]:
+    return min(rect[0] for rect in run), max(rect[0] + rect[2] for rect in run)
+
+def _split_columns(regions: List[Tuple[int, int, int, int]], gap: int, min_width: int) -> List[List[Tuple[int, int, int, int]]]:
+    """
+    領域を横方向の隙間で段に分ける
+
+    min_widthより狭いまとまり（分量・手順番号など）は段とみなさず、隙間の狭い側の隣に含める
+    """
+    runs = _split_runs(regions, 0, gap)
+    while len(runs) > 1:
+        narrow = [index for index, run in enumerate(runs) if _run_extent(run)[1] - _run_extent(run)[0] < min_width]
+        if not narrow:
+            break
+        index = narrow[0]
+        start, end = _run_extent(runs[index])
+        left_gap = start - _run_extent(runs[index - 1])[1] if index > 0 else None
+        right_gap = _run_extent(runs[index + 1])[0] - end if index + 1 < len(runs) else None
+        target = index - 1 if right_gap is None or (left_gap is not None and left_gap <= right_gap) else index + 1
+        runs[target].extend(runs.pop(index))
+    return runs
+
+def _reading_order(regions: List[Tuple[int, int, int, int]], column_gap: int, column_min_width: int) -> List[Tuple[int, int, int, int]]:
+    """
+    領域を段組みに分けて読む順に並べる
+
+    まず上下に重ならない帯に分け、段組みが続く帯は1つにまとめる
+    （両方の段で余白の高さが揃っていても、段をまたいで読まないため）。
+    まとめた帯ごとに左の段から、各段の中は上から（高さの重なる領域は左から）並べる
+    """
+    groups: List[List[Tuple[int, int, int, int]]] = []
+    for band in _split_runs(regions, 1, 0):
+        if groups and len(_split_columns(groups[-1] + band, column_gap, column_min_width)) > 1:
+            groups[-1].extend(band)
+        else:
+            groups.append(band)
+
+    ordered: List[Tuple[int, int, int, int]] = []
+    for group in groups:
+        for column in sorted(_split_columns(group, column_gap, column_min_width), key=lambda run: _run_extent(run)[0]):
+            for row in _split_runs(column, 1, 0):
+                ordered.extend(sorted(row, key=lambda rect: rect[0]))
+    return ordered
+
+def _recognize_region(processed_image: np.ndarray, psm: int) -> str:
+    """1つの領域をOCRエンジンで文字認識する"""
+    return get_engine().recognize(processed_image, psm).strip()
+
+def _recognize_text(processed_image: np.ndarray, regions: Optional[List[Tuple[int, int, int, int]]] = None) -> str:
+    """
+    前処理済み画像をOCRエンジンで文字認識する
+
+    検出した領域ごとに切り出して並列に認識し、1行の領域は--psm 7、段落は--psm 6で読む。
+    領域が見つからない（または多すぎる）場合はページ全体を--psm 6で読む。
+    領域の区切りは空行で表す
+    """
+    if regions is None:
+        regions = detect_text_regions(processed_image)
+    if not regions or len(regions) > OCR_MAX_REGIONS:
+        return _recognize_region(processed_image, 6)
+
+    page_h, page_w = processed_image.shape
+    padding = 10
+    crops = []
+    for x, y, w, h in regions:
+        crop = processed_image[max(0, y - padding):min(page_h, y + h + padding), max(0, x - padding):min(page_w, x + w + padding)]
+        crops.append((crop, 7 if h < page_h * SINGLE_LINE_HEIGHT_RATIO else 6))
+
+    with ThreadPoolExecutor(max_workers=OCR_REGION_THREADS) as pool:
+        texts = list(pool.map(lambda item: _recognize_region(*item), crops))
+    return "\n\n".join(text for text in texts if text)
 
 def extract_text_from_image(image_data: bytes) -> str:
     """
@@ -38,21 +218,47 @@ def extract_text_from_image(image_data: bytes) -> str:
     try:
         # 画像の前処理
         processed_image = preprocess_image(image_data)
-        
-        # OCR実行（日本語設定）
-        custom_config = r'--oem 3 --psm 6 -l jpn'
-        text = pytesseract.image_to_string(processed_image, config=custom_config)
-        
-        return text.strip()
+        return _recognize_text(processed_image)
     except Exception as e:
         print(f"OCR処理中にエラーが発生しました: {e}")
         return ""
 
+# parse_recipe_textの結果が変わる変更をした場合に上げる（キャッシュ済みのテキストから解析し直す）
+PARSER_VERSION = 1
+
+# 見出しの前後に付く記号
+SECTION_MARKS = "【】[]■□●○◆◇▼▽★☆<>＜＞「」:：・ 　"
+INGREDIENT_HEADERS = ("材料", "原材料", "食材", "ingredients")
+STEP_HEADERS = ("作り方", "つくり方", "手順", "調理法", "steps", "instructions")
+# 見出しとみなす行の最大文字数（「材料を加える」のような手順の行を見出しと誤認しない）
+HEADER_MAX_LENGTH = 12
+QUANTITY_PATTERN = re.compile(
+    r'[0-9]+(/[0-9]+)?\s*(g|kg|ml|cc|l|個|本|枚|切れ|片|かけ|袋|缶|束|株|合|カップ)|(大さじ|小さじ)\s*[0-9]|少々|適量|適宜|ひとつまみ',
+    re.IGNORECASE,
+)
+# 番号付きの手順（NFKC正規化後。①は1、（1）は(1)になる）
+STEP_NUMBER_PATTERN = re.compile(r'^\(?[0-9]{1,2}[\.\)、]\s*|^[0-9]{1,2}\s+')
+
+def _section_header(line: str) -> Optional[str]:
+    """見出し行なら "ingredients" / "steps" を返す"""
+    label = line.strip(SECTION_MARKS).lower()
+    if len(label) > HEADER_MAX_LENGTH:
+        return None
+    if label.startswith(INGREDIENT_HEADERS):
+        return "ingredients"
+    if label.startswith(STEP_HEADERS):
+        return "steps"
+    return None
+
 def parse_recipe_text(text: str) -> Dict[str, any]:
     """
     OCRで抽出したテキストからレシピ情報を構造化する
+
+    見出し（材料・作り方）は短い行のみを対象にし、番号のない手順の行は
+    直前の手順の続きとして連結する
     """
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    lines = [unicodedata.normalize("NFKC", line).strip() for line in text.split('\n')]
+    lines = [line for line in lines if line]
     
     recipe_data = {
         "title": "",
@@ -61,46 +267,30 @@ def parse_recipe_text(text: str) -> Dict[str, any]:
         "photo_url": ""
     }
     
-    # タイトルの抽出（最初の行または最も大きなフォントの行）
-    if lines:
-        recipe_data["title"] = lines[0]
-    
-    # 材料セクションの検出
-    ingredients_section = False
-    steps_section = False
+    # タイトルの抽出（見出しでない最初の行）
+    for line in lines:
+        if _section_header(line) is None:
+            recipe_data["title"] = line
+            break
     
-    for i, line in enumerate(lines):
-        line_lower = line.lower()
-        
-        # 材料セクションの開始を検出
-        if any(keyword in line for keyword in ["材料", "原材料", "食材", "ingredients"]):
-            ingredients_section = True
-            steps_section = False
+    section = None
+    for line in lines:
+        header = _section_header(line)
+        if header is not None:
+            section = header
             continue
         
-        # 手順セクションの開始を検出
-        if any(keyword in line for keyword in ["作り方", "手順", "調理法", "方法", "steps", "instructions"]):
-            ingredients_section = False
-            steps_section = True
-            continue
-        
-        # 材料の抽出
-        if ingredients_section:
-            # 材料らしい行を検出（分量や単位が含まれている）
-            if re.search(r'[0-9]+(g|ml|個|本|枚|切れ|大さじ|小さじ|カップ|cc)', line):
-                recipe_data["ingredients"].append(line)
-            # 材料名のみの行も追加
-            elif len(line) > 1 and not re.search(r'^[0-9]+\.', line):
+        # 材料の抽出（分量を含む行と、材料名のみの行）
+        if section == "ingredients":
+            if QUANTITY_PATTERN.search(line) or (len(line) > 1 and not STEP_NUMBER_PATTERN.match(line)):
                 recipe_data["ingredients"].append(line)
         
-        # 手順の抽出
-        if steps_section:
-            # 手順番号が含まれている行
-            if re.search(r'^[0-9]+\.', line) or re.search(r'^\([0-9]+\)', line):
-                recipe_data["steps"].append(line)
-            # または動詞で始まる行（調理手順らしい）
-            elif re.search(r'^(切|焼|煮|炒|混|加|入|取|置|冷)', line):
+        # 手順の抽出（番号付きの行で新しい手順、それ以外は直前の手順の続き）
+        elif section == "steps":
+            if STEP_NUMBER_PATTERN.match(line) or not recipe_data["steps"]:
                 recipe_data["steps"].append(line)
+            else:
+                recipe_data["steps"][-1] += line
     
     # 材料と手順が空の場合、シンプルなパターンで再試行
     if not recipe_data["ingredients"] and not recipe_data["steps"]:
@@ -136,13 +326,8 @@ def _simple_parse_fallback(lines: List[str]) -> Dict[str, any]:
     
     return recipe_data
 
-def extract_recipe_from_book_photo(image_data: bytes) -> Dict[str, any]:
-    """
-    書籍写真からレシピ情報を抽出するメイン関数
-    """
-    # OCRでテキストを抽出
-    extracted_text = extract_text_from_image(image_data)
-    
+def _build_recipe_data(extracted_text: str) -> Dict[str, any]:
+    """抽出テキストを構造化し、最低限の情報があるか検証する"""
     if not extracted_text:
         raise ValueError("画像からテキストを抽出できませんでした")
     
@@ -153,4 +338,198 @@ def extract_recipe_from_book_photo(image_data: bytes) -> Dict[str, any]:
     if not recipe_data["title"] and not recipe_data["ingredients"] and not recipe_data["steps"]:
         raise ValueError("レシピ情報を抽出できませんでした")
     
-    return recipe_data
\ No newline at end of file
+    return recipe_data
+
+def extract_recipe_from_book_photo(image_data: bytes) -> Dict[str, any]:
+    """
+    書籍写真からレシピ情報を抽出するメイン関数
+    """
+    # OCRでテキストを抽出
+    extracted_text = extract_text_from_image(image_data)
+    return _build_recipe_data(extracted_text)
+
+def extract_text_with_timings(image_data: bytes) -> Tuple[str, Dict[str, float]]:
+    """
+    extract_text_from_imageと同じ処理を行い、段階ごとの処理時間（秒）も返す
+    （OCRワーカープロセス内で実行される）
+    """
+    timings = {}
+    start = time.perf_counter()
+    try:
+        processed_image = preprocess_image(image_data)
+        timings["preprocess"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        regions = detect_text_regions(processed_image)
+        timings["layout"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        extracted_text = _recognize_text(processed_image, regions)
+        timings["recognize"] = time.perf_counter() - start
+    except Exception as e:
+        print(f"OCR処理中にエラーが発生しました: {e}")
+        extracted_text = ""
+    return extracted_text, timings
+
+def _ocr_cache_key(image_data: bytes) -> str:
+    return f"v{OCR_PIPELINE_VERSION}:{hashlib.sha256(image_data).hexdigest()}"
+
+def _parse_with_timing(extracted_text: str) -> Dict[str, any]:
+    start = time.perf_counter()
+    try:
+        return _build_recipe_data(extracted_text)
+    finally:
+        metrics.observe("ocr.parse", time.perf_counter() - start)
+
+async def _parse_and_store(key: str, extracted_text: str) -> Dict[str, any]:
+    """
+    OCRで抽出したテキストを解析し、テキストと解析結果をキャッシュする
+    （テキストが空の場合は一時的な失敗の可能性があるため保存しない）
+    """
+    try:
+        recipe_data = _parse_with_timing(extracted_text)
+    except ValueError:
+        if extracted_text:
+            await ocr_cache.set(key, extracted_text.encode(), {"parser_version": PARSER_VERSION, "recipe": None})
+        raise
+    await ocr_cache.set(key, extracted_text.encode(), {"parser_version": PARSER_VERSION, "recipe": recipe_data})
+    return recipe_data
+
+async def _recipe_from_cache(key: str) -> Optional[Dict[str, any]]:
+    """
+    キャッシュ済みのOCR結果からレシピ情報を返す（未キャッシュの場合はNone）
+
+    parse_recipe_textが更新されていれば保存済みのテキストから解析し直す
+    """
+    entry = await ocr_cache.get(key)
+    if entry is None:
+        metrics.inc("ocr_cache.misses")
+        return None
+    metrics.inc("ocr_cache.hits")
+    if entry.meta.get("parser_version") == PARSER_VERSION:
+        if entry.meta.get("recipe") is None:
+            raise ValueError("レシピ情報を抽出できませんでした")
+        return entry.meta["recipe"]
+    metrics.inc("ocr_cache.reparsed")
+    return await _parse_and_store(key, entry.value.decode())
+
+def _observe_timings(timings: Dict[str, float]) -> None:
+    for stage, seconds in timings.items():
+        metrics.observe(f"ocr.{stage}", seconds)
+
+async def extract_recipe_from_book_photo_async(image_data: bytes) -> Dict[str, any]:
+    """
+    OCR専用プロセスプールで書籍写真からレシピ情報を抽出する
+    （同じ画像の結果はキャッシュから返す。待ち行列が満杯の場合はOcrQueueFullError）
+    """
+    key = _ocr_cache_key(image_data)
+    recipe_data = await _recipe_from_cache(key)
+    if recipe_data is not None:
+        return recipe_data
+
+    extracted_text, timings = await ocr_executor.submit(extract_text_with_timings, image_data)
+    _observe_timings(timings)
+    return await _parse_and_store(key, extracted_text)
+
+# 一括取り込みでzip内から読み込む画像の拡張子
+BOOK_PAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp", ".webp")
+
+class BookPagesLimitError(ValueError):
+    """展開したページ数・サイズが上限を超えている"""
+
+@dataclass
+class _PageBudget:
+    pages: int
+    bytes: int
+
+    def take(self, data: bytes) -> None:
+        self.pages -= 1
+        self.bytes -= len(data)
+        if self.pages < 0:
+            raise BookPagesLimitError("Too many pages in upload")
+        if self.bytes < 0:
+            raise BookPagesLimitError("Expanded pages are too large")
+
+def _is_tiff(data: bytes) -> bool:
+    return data[:4] in (b"II*\x00", b"MM\x00*")
+
+def _split_tiff_pages(data: bytes, budget: _PageBudget) -> List[bytes]:
+    """マルチページTIFFを1ページずつのPNGに分割"""
+    pages = []
+    with Image.open(io.BytesIO(data)) as tiff:
+        if getattr(tiff, "n_frames", 1) > budget.pages:
+            raise BookPagesLimitError("Too many pages in upload")
+        for frame in ImageSequence.Iterator(tiff):
+            buffer = io.BytesIO()
+            frame.convert("RGB").save(buffer, format="PNG")
+            budget.take(buffer.getvalue())
+            pages.append(buffer.getvalue())
+    return pages
+
+def _expand(data: bytes, budget: _PageBudget) -> List[bytes]:
+    if zipfile.is_zipfile(io.BytesIO(data)):
+        pages = []
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            infos = sorted(
+                (info for info in archive.infolist()
+                 if not info.is_dir() and info.filename.lower().endswith(BOOK_PAGE_EXTENSIONS)),
+                key=lambda info: info.filename,
+            )
+            # 展開前に宣言サイズで判定する（ZipFileは宣言サイズを超えて展開しない）
+            if sum(info.file_size for info in infos) > budget.bytes:
+                raise BookPagesLimitError("Expanded pages are too large")
+            for info in infos:
+                pages.extend(_expand(archive.read(info), budget))
+        return pages
+    if _is_tiff(data):
+        return _split_tiff_pages(data, budget)
+    budget.take(data)
+    return [data]
+
+def expand_book_pages(data: bytes, max_pages: int, max_bytes: int) -> List[bytes]:
+    """
+    アップロードされたファイルをページ画像のリストに展開する
+    （zipはファイル名順、マルチページTIFFはページ順、それ以外は1枚の画像として扱う）
+
+    展開後のページ数がmax_pages、合計サイズがmax_bytesを超える場合はBookPagesLimitError。
+    zipの展開とTIFFの変換はCPUを使うため、イベントループからはスレッドで呼び出すこと
+    """
+    return _expand(data, _PageBudget(pages=max_pages, bytes=max_bytes))
+
+async def extract_recipes_from_book_pages_async(pages: List[bytes]) -> List[Union[Dict[str, any], Exception]]:
+    """
+    複数ページの書籍写真をOCR専用プロセスプールで並列に処理する
+    （結果はページ順で、失敗したページは例外オブジェクトが入る）
+    """
+    keys = [_ocr_cache_key(page) for page in pages]
+    recipes: List[Union[Dict[str, any], Exception, None]] = []
+    for key in keys:
+        try:
+            recipes.append(await _recipe_from_cache(key))
+        except ValueError as e:
+            recipes.append(e)
+
+    # 未キャッシュのページだけをOCRする（同じ画像が複数あっても1回）
+    pending: Dict[str, bytes] = {}
+    for key, page, recipe in zip(keys, pages, recipes):
+        if recipe is None:
+            pending.setdefault(key, page)
+    results = await ocr_executor.map(extract_text_with_timings, list(pending.values()))
+
+    outcomes: Dict[str, Union[Dict[str, any], Exception]] = {}
+    for key, result in zip(pending, results):
+        if isinstance(result, Exception):
+            outcomes[key] = result
+            continue
+        extracted_text, timings = result
+        _observe_timings(timings)
+        try:
+            outcomes[key] = await _parse_and_store(key, extracted_text)
+        except ValueError as e:
+            outcomes[key] = e
+
+    for i, key in enumerate(keys):
+        if recipes[i] is None:
+            outcome = outcomes[key]
+            recipes[i] = copy.deepcopy(outcome) if isinstance(outcome, dict) else outcome
+    return recipes
@@ -0,0 +1,92 @@
+import queue
+import threading
+from abc import ABC, abstractmethod
+from os import environ
+from typing import Optional
+import numpy as np
+import pytesseract
+
+# ページ単位・領域単位の並列化と重ならないよう、Tesseract内部のスレッドは1つに制限
+# （OpenMPはライブラリの読み込み時に参照するため、tesserocrのimportより前に設定する）
+environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# OCRエンジン（auto: tesserocrが使えればtesserocr、なければpytesseract）
+OCR_ENGINE = environ.get("OCR_ENGINE", "auto")
+OCR_LANG = environ.get("OCR_LANG", "jpn")
+# 1ページ内の領域を並列に認識するスレッド数（エンジンもこの数だけ用意する）
+OCR_REGION_THREADS = int(environ.get("OCR_REGION_THREADS", "2"))
+
+class OcrEngine(ABC):
+    """二値化済みのグレースケール画像（numpy配列）から文字を認識するエンジンのインターフェース"""
+
+    name: str
+
+    @abstractmethod
+    def recognize(self, image: np.ndarray, psm: int) -> str:
+        """psmはTesseractのページ分割モード（6: 段落、7: 1行）"""
+
+class TesserocrEngine(OcrEngine):
+    """Tesseractを C API（tesserocr）でプロセス内に常駐させるエンジン
+
+    言語データの読み込みは生成時の1回だけで、画像はメモリ上のバイト列のまま渡す。
+    TessBaseAPIはスレッドセーフではないため、instances個を用意して借りて使う
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str, instances: int):
+        self._apis: "queue.Queue" = queue.Queue()
+        for _ in range(max(1, instances)):
+            self._apis.put(tesserocr.PyTessBaseAPI(lang=lang, oem=tesserocr.OEM.DEFAULT))
+
+    def recognize(self, image: np.ndarray, psm: int) -> str:
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape
+        api = self._apis.get()
+        try:
+            api.SetPageSegMode(psm)
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+            self._apis.put(api)
+
+class PytesseractEngine(OcrEngine):
+    """tesseractコマンドを1回ごとに起動するエンジン（tesserocrが使えない環境向け）"""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str):
+        self.lang = lang
+
+    def recognize(self, image: np.ndarray, psm: int) -> str:
+        return pytesseract.image_to_string(image, config=f'--oem 3 --psm {psm} -l {self.lang}')
+
+def create_engine() -> OcrEngine:
+    if OCR_ENGINE == "tesserocr" and tesserocr is None:
+        raise RuntimeError("OCR_ENGINE=tesserocr requires the 'tesserocr' package")
+    if OCR_ENGINE in ("auto", "tesserocr") and tesserocr is not None:
+        return TesserocrEngine(OCR_LANG, OCR_REGION_THREADS)
+    if OCR_ENGINE in ("auto", "pytesseract"):
+        return PytesseractEngine(OCR_LANG)
+    raise ValueError(f"Unknown OCR_ENGINE: {OCR_ENGINE}")
+
+# OCRワーカープロセスごとに1つ（初回の認識時、またはwarm_up()で生成）
+_engine: Optional[OcrEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> OcrEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine()
+    return _engine
+
+def warm_up() -> None:
+    """ワーカープロセスの起動時に言語データを読み込んでおく（初回の認識を遅くしない）"""
+    get_engine()
@@ -0,0 +1,90 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from os import environ
+from typing import Callable, List, Optional
+from src.services.metrics import metrics
+from src.services.ocr_engine import warm_up
+
+# OCRワーカー数（デフォルトはCPUコア数）と、実行待ちとして受け付ける件数
+OCR_MAX_WORKERS = int(environ.get("OCR_MAX_WORKERS", os.cpu_count() or 1))
+OCR_MAX_QUEUE = int(environ.get("OCR_MAX_QUEUE", OCR_MAX_WORKERS * 2))
+
+class OcrQueueFullError(Exception):
+    """OCRの実行待ちが上限に達している"""
+
+class OcrExecutor:
+    """OCR専用のプロセスプール
+
+    実行中＋待ち行列の合計がmax_workers + max_queueを超える投入は
+    OcrQueueFullErrorで即座に拒否する（呼び出し側で503を返す）
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # イベントループのスレッドごとforkしないようspawnで起動し、
+            # 起動時にOCRエンジン（言語データ）を読み込んでおく
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_up,
+            )
+        return self._pool
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("ocr.in_flight", self._in_flight)
+        metrics.set_gauge("ocr.queue_depth", max(0, self._in_flight - self.max_workers))
+
+    async def _run(self, fn: Callable, *args):
+        self._in_flight += 1
+        self._update_gauges()
+        try:
+            loop = asyncio.get_running_loop()
+            with metrics.timer("ocr.total"):
+                return await loop.run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            self._in_flight -= 1
+            self._update_gauges()
+
+    def _check_capacity(self, slots: int = 1) -> None:
+        if self._in_flight + slots > self.capacity:
+            metrics.inc("ocr.rejected")
+            raise OcrQueueFullError(f"OCR queue is full ({self._in_flight}/{self.capacity})")
+
+    async def submit(self, fn: Callable, *args):
+        """fn(*args)をワーカープロセスで実行して結果を返す"""
+        self._check_capacity()
+        return await self._run(fn, *args)
+
+    async def map(self, fn: Callable, items: List) -> List:
+        """itemsの各要素にfnを全ワーカーで並列に適用する
+
+        一度に投入するのはワーカー数分までなので、件数が多くても待ち行列を占有しない。
+        結果は入力順で、失敗した要素は例外オブジェクトが入る
+        """
+        self._check_capacity(min(len(items), self.max_workers))
+        slots = asyncio.Semaphore(self.max_workers)
+
+        async def run_one(item):
+            async with slots:
+                return await self._run(fn, item)
+
+        return await asyncio.gather(*(run_one(item) for item in items), return_exceptions=True)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+ocr_executor = OcrExecutor(OCR_MAX_WORKERS, OCR_MAX_QUEUE)
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from os import environ
+from typing import Dict, Optional, Set
+import aiofiles
+from src.cruds import recipe as crud_recipe
+from src.db import async_session
+from src.schemas.recipe import OcrJobStatus
+from src.services import ocr as services_ocr
+from src.services.metrics import metrics
+from src.services.ocr_executor import OcrQueueFullError, ocr_executor
+
+# 受け付けた画像とジョブ状態の保存先（ワーカー間で共有するディレクトリ）
+OCR_JOB_DIR = environ.get("OCR_JOB_DIR", "/workspace/uploads/ocr_jobs")
+# 未完了ジョブの受付上限と、完了ジョブを保持する期間
+OCR_MAX_PENDING_JOBS = int(environ.get("OCR_MAX_PENDING_JOBS", "100"))
+OCR_JOB_RETENTION = timedelta(hours=int(environ.get("OCR_JOB_RETENTION_HOURS", "24")))
+# 未完了のまま状態が更新されないジョブを、再起動などで中断されたとみなすまでの時間
+OCR_JOB_STALE_AFTER = timedelta(minutes=int(environ.get("OCR_JOB_STALE_MINUTES", "30")))
+# プロセスプールが満杯のときに再投入するまでの待ち時間（初回と上限）
+OCR_JOB_RETRY_DELAY = 0.5
+OCR_JOB_RETRY_MAX_DELAY = 10.0
+# 状態ファイルを確認する間隔（他ワーカーのジョブをロングポーリングする場合）
+POLL_INTERVAL = 0.5
+# ジョブディレクトリ全体を走査する間隔（秒）
+SWEEP_INTERVAL = 600
+
+IMAGE_FILENAME = "image"
+STATUS_FILENAME = "status.json"
+
+FINISHED_STATUSES = {OcrJobStatus.succeeded, OcrJobStatus.failed}
+
+class OcrJobQueueFullError(Exception):
+    """未完了のOCRジョブが上限に達している"""
+
+@dataclass
+class OcrJob:
+    job_id: str
+    cooking_date: date
+    source_book_title: Optional[str] = None
+    source_page: Optional[int] = None
+    status: OcrJobStatus = OcrJobStatus.pending
+    recipe_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    updated_at: datetime = field(default_factory=datetime.now)
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "recipe_id": self.recipe_id,
+            "error": self.error,
+            "cooking_date": self.cooking_date.isoformat(),
+            "source_book_title": self.source_book_title,
+            "source_page": self.source_page,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "OcrJob":
+        return cls(
+            job_id=data["job_id"],
+            status=OcrJobStatus(data["status"]),
+            recipe_id=data.get("recipe_id"),
+            error=data.get("error"),
+            cooking_date=date.fromisoformat(data["cooking_date"]),
+            source_book_title=data.get("source_book_title"),
+            source_page=data.get("source_page"),
+            created_at=datetime.fromisoformat(data["created_at"]),
+            updated_at=datetime.fromisoformat(data["updated_at"]),
+        )
+
+# このワーカーが受け付けたジョブ
+_jobs: Dict[str, OcrJob] = {}
+# 実行中タスクへの参照（GCで消えないよう保持）
+_tasks: Set[asyncio.Task] = set()
+# プロセスプールの待ち行列を溢れさせないよう、同時に投入するジョブ数を制限
+_submit_slots = asyncio.Semaphore(ocr_executor.max_workers)
+# 最後にジョブディレクトリを走査した時刻（event loopの時刻）
+_last_sweep: Optional[float] = None
+
+def _job_dir(job_id: str) -> str:
+    return os.path.join(OCR_JOB_DIR, job_id)
+
+async def _save_status(job: OcrJob) -> None:
+    """ジョブ状態をファイルに書き出す（他ワーカーからの参照用）"""
+    job.updated_at = datetime.now()
+    path = os.path.join(_job_dir(job.job_id), STATUS_FILENAME)
+    tmp_path = f"{path}.tmp"
+    async with aiofiles.open(tmp_path, "w") as f:
+        await f.write(json.dumps(job.to_dict(), ensure_ascii=False))
+    os.replace(tmp_path, path)
+
+def _load_status(job_id: str) -> Optional[OcrJob]:
+    path = os.path.join(_job_dir(job_id), STATUS_FILENAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return OcrJob.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+
+def _remove_image(job_id: str) -> None:
+    image_path = os.path.join(_job_dir(job_id), IMAGE_FILENAME)
+    if os.path.exists(image_path):
+        os.remove(image_path)
+
+def _prune_finished_jobs() -> None:
+    """保持期間を過ぎた完了ジョブを削除"""
+    expire_before = datetime.now() - OCR_JOB_RETENTION
+    for job_id, job in list(_jobs.items()):
+        if job.finished and job.updated_at < expire_before:
+            del _jobs[job_id]
+            shutil.rmtree(_job_dir(job_id), ignore_errors=True)
+
+async def sweep_job_dir() -> None:
+    """
+    ジョブディレクトリを走査し、このワーカーが管理していないジョブを片付ける
+
+    再起動前のプロセスや他のワーカーが残したジョブのうち、保持期間を過ぎた完了ジョブは削除し、
+    OCR_JOB_STALE_AFTER以上状態が更新されていない未完了ジョブは中断されたとみなして失敗にする
+    """
+    global _last_sweep
+    _last_sweep = asyncio.get_running_loop().time()
+    now = datetime.now()
+    try:
+        job_ids = os.listdir(OCR_JOB_DIR)
+    except FileNotFoundError:
+        return
+
+    for job_id in job_ids:
+        if job_id in _jobs:
+            continue
+        try:
+            job = _load_status(job_id)
+        except (ValueError, KeyError):
+            job = None
+        if job is None:
+            # 状態ファイルを書き出す前に中断されたジョブ
+            try:
+                modified_at = datetime.fromtimestamp(os.path.getmtime(_job_dir(job_id)))
+            except FileNotFoundError:
+                continue
+            if modified_at < now - OCR_JOB_STALE_AFTER:
+                shutil.rmtree(_job_dir(job_id), ignore_errors=True)
+                metrics.inc("ocr_jobs.swept")
+        elif job.finished:
+            if job.updated_at < now - OCR_JOB_RETENTION:
+                shutil.rmtree(_job_dir(job_id), ignore_errors=True)
+                metrics.inc("ocr_jobs.swept")
+        elif job.updated_at < now - OCR_JOB_STALE_AFTER:
+            job.status = OcrJobStatus.failed
+            job.error = "OCR job was interrupted"
+            _remove_image(job_id)
+            await _save_status(job)
+            metrics.inc("ocr_jobs.interrupted")
+
+async def _maybe_sweep_job_dir() -> None:
+    if _last_sweep is None or asyncio.get_running_loop().time() - _last_sweep >= SWEEP_INTERVAL:
+        await sweep_job_dir()
+
+async def _extract_with_retry(job: OcrJob, image_data: bytes) -> dict:
+    """プロセスプールが満杯の間は、間隔を延ばしながら再投入する（ジョブは失敗にしない）"""
+    delay = OCR_JOB_RETRY_DELAY
+    while True:
+        try:
+            return await services_ocr.extract_recipe_from_book_photo_async(image_data)
+        except OcrQueueFullError:
+            metrics.inc("ocr_jobs.retried")
+            # 状態ファイルの更新時刻を進め、中断されたジョブと区別できるようにする
+            await _save_status(job)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, OCR_JOB_RETRY_MAX_DELAY)
+
+async def _process(job: OcrJob) -> None:
+    """ジョブを実行し、成功したらレシピを登録する"""
+    image_path = os.path.join(_job_dir(job.job_id), IMAGE_FILENAME)
+    try:
+        async with aiofiles.open(image_path, "rb") as f:
+            image_data = await f.read()
+
+        async with _submit_slots:
+            job.status = OcrJobStatus.running
+            await _save_status(job)
+            recipe_data = await _extract_with_retry(job, image_data)
+
+        async with async_session() as db:
+            recipe = await crud_recipe.create_from_book_photo(
+                db,
+                recipe_data=recipe_data,
+                cooking_date=job.cooking_date,
+                source_book_title=job.source_book_title,
+                source_page=job.source_page
+            )
+        job.recipe_id = recipe.id
+        job.status = OcrJobStatus.succeeded
+        metrics.inc("ocr_jobs.succeeded")
+    except Exception as e:
+        print(f"OCRジョブ{job.job_id}でエラーが発生しました: {e}")
+        job.error = str(e)
+        job.status = OcrJobStatus.failed
+        metrics.inc("ocr_jobs.failed")
+    finally:
+        _remove_image(job.job_id)
+        await _save_status(job)
+        job.done.set()
+
+async def create_job(
+    image_data: bytes,
+    *,
+    cooking_date: date,
+    source_book_title: Optional[str] = None,
+    source_page: Optional[int] = None
+) -> OcrJob:
+    """画像を保存してOCRジョブを登録し、バックグラウンドで実行を開始する"""
+    _prune_finished_jobs()
+    await _maybe_sweep_job_dir()
+    pending = sum(1 for job in _jobs.values() if not job.finished)
+    if pending >= OCR_MAX_PENDING_JOBS:
+        raise OcrJobQueueFullError(f"Too many pending OCR jobs ({pending})")
+
+    job = OcrJob(
+        job_id=uuid.uuid4().hex,
+        cooking_date=cooking_date,
+        source_book_title=source_book_title,
+        source_page=source_page,
+    )
+    os.makedirs(_job_dir(job.job_id), exist_ok=True)
+    async with aiofiles.open(os.path.join(_job_dir(job.job_id), IMAGE_FILENAME), "wb") as f:
+        await f.write(image_data)
+    await _save_status(job)
+
+    _jobs[job.job_id] = job
+    task = asyncio.create_task(_process(job))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    metrics.inc("ocr_jobs.created")
+    return job
+
+async def get_job(job_id: str, wait: float = 0) -> Optional[OcrJob]:
+    """ジョブ状態を取得（waitを指定すると完了まで最大wait秒待つ）"""
+    job = _jobs.get(job_id)
+    if job is not None:
+        if wait and not job.finished:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    # 他のワーカーが受け付けたジョブは状態ファイルを参照する
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        job = _load_status(job_id)
+        if job is None or job.finished or loop.time() >= deadline:
+            return job
+        await asyncio.sleep(POLL_INTERVAL)
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from os import environ
+from typing import Dict, Optional, Set
+import aiofiles
+import httpx
+from src.cruds import recipe as crud_recipe
+from src.db import async_session
+from src.services import http_client
+from src.services import storage as services_storage
+from src.services.metrics import metrics
+from src.services.upload import SNIFF_LENGTH, sniff_image_extension
+
+# スクレイピングしたレシピ画像（外部URL）の取得設定
+PHOTO_FETCH_RETRIES = int(environ.get("PHOTO_FETCH_RETRIES", "3"))
+PHOTO_FETCH_BACKOFF = float(environ.get("PHOTO_FETCH_BACKOFF", "1.0"))
+PHOTO_FETCH_MAX_SIZE = int(environ.get("PHOTO_FETCH_MAX_SIZE", 10 * 1024 * 1024))
+
+class PhotoFetchError(Exception):
+    """外部画像を取得・保存できない（再試行しない）"""
+
+@dataclass
+class DownloadedPhoto:
+    temp_path: str
+    size: int
+    sha256: str
+    extension: str
+
+# 取得中の外部URL（同じURLの取得を重複させない）
+_in_flight: Dict[str, asyncio.Task] = {}
+# 実行中タスクへの参照（GCで消えないよう保持）
+_tasks: Set[asyncio.Task] = set()
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+async def _download(url: str) -> DownloadedPhoto:
+    """外部画像を一時ファイルへ逐次書き込み（アップロードと同じく上限サイズと先頭バイトを検査）"""
+    temp_path = os.path.join(services_storage.photo_storage.work_dir, f".fetch-{uuid.uuid4().hex}.tmp")
+    hasher = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        async with http_client.stream(url) as response:
+            async with aiofiles.open(temp_path, "wb") as f:
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > PHOTO_FETCH_MAX_SIZE:
+                        raise PhotoFetchError(f"Image too large: {url}")
+                    if len(head) < SNIFF_LENGTH:
+                        head = (head + chunk)[:SNIFF_LENGTH]
+                    hasher.update(chunk)
+                    await f.write(chunk)
+        extension = sniff_image_extension(head)
+        if extension is None:
+            raise PhotoFetchError(f"Unsupported image type: {url}")
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return DownloadedPhoto(temp_path=temp_path, size=size, sha256=hasher.hexdigest(), extension=extension)
+
+async def _download_with_retry(url: str) -> DownloadedPhoto:
+    for attempt in range(PHOTO_FETCH_RETRIES + 1):
+        try:
+            with metrics.timer("photo_fetch.download"):
+                return await _download(url)
+        except Exception as e:
+            if attempt >= PHOTO_FETCH_RETRIES or not _is_retryable(e):
+                raise
+            metrics.inc("photo_fetch.retries")
+            await asyncio.sleep(PHOTO_FETCH_BACKOFF * (2 ** attempt))
+
+async def _localize(url: str) -> Optional[str]:
+    """外部画像を保存し、その画像を参照している写真のURLを保存先のものに付け替える"""
+    try:
+        downloaded = await _download_with_retry(url)
+        filename = f"{downloaded.sha256}{downloaded.extension}"
+        photo_url = f"/uploads/photos/{filename}"
+
+        async def store_file():
+            stored = await services_storage.store_photo(downloaded.temp_path, downloaded.sha256, downloaded.extension)
+            return {"width": stored.width, "height": stored.height}
+
+        try:
+            async with async_session() as db:
+                try:
+                    updated = await crud_recipe.replace_photo_url(
+                        db, url, photo_url, file_size=downloaded.size, store_file=store_file
+                    )
+                except Exception:
+                    # 保存の途中で失敗した場合、参照のないファイルを残さない
+                    await crud_recipe.release_photo_file(
+                        db, photo_url, remove_files=lambda: services_storage.remove_photo(filename)
+                    )
+                    raise
+        finally:
+            if os.path.exists(downloaded.temp_path):
+                os.remove(downloaded.temp_path)
+        if updated == 0:
+            # 取得中にレシピが削除された等で付け替える写真がなかった
+            metrics.inc("photo_fetch.orphaned")
+            return None
+        metrics.inc("photo_fetch.succeeded")
+        return photo_url
+    except Exception as e:
+        # 失敗しても外部URLのまま表示できるので、ログだけ残す
+        print(f"外部画像の取得に失敗しました {url}: {e}")
+        metrics.inc("photo_fetch.failed")
+        return None
+    finally:
+        _in_flight.pop(url, None)
+
+def schedule_localize(url: Optional[str]) -> Optional[asyncio.Task]:
+    """外部画像の取得をバックグラウンドで開始（取得中の同じURLは既存のタスクを返す）"""
+    if not url or not url.startswith(("http://", "https://")):
+        return None
+    task = _in_flight.get(url)
+    if task is None:
+        task = asyncio.create_task(_localize(url))
+        _in_flight[url] = task
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+    return task
+
+def shutdown() -> None:
+    """実行中の取得を中止（アプリ終了時）"""
+    for task in list(_tasks):
+        task.cancel()
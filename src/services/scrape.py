@@ -1,92 +1,101 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+from email.utils import formatdate
+from os import environ
+from typing import Dict, Iterator, List, Tuple
 from urllib.parse import urlparse
+from src.services import http_client, site_parsers
+from src.services.disk_cache import DiskCache, DiskCacheEntry
+from src.services.metrics import metrics
 
-def scrape_recipe_from_delish(url: str):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    title = soup.find('h1').text  # タイトルを取得
-    ingredients = [ingredient.text for ingredient in soup.find_all(class_='ingredient')]  # 材料リスト
-    steps = [step.text.strip() for step in soup.find_all("p", {"class": "step-desc"})]  # 手順
-    # 最初の画像を取得
-    video_tag = soup.find("video")  # 最初の<video>タグを取得
-    photo_url = None
-    if video_tag:
-        photo_url = video_tag.get("poster")  # poster属性から画像URLを取得
-    return {"title": title, "source_url": url, "ingredients": ingredients, "steps": steps, "photo_url": photo_url}
-
-def scrape_recipe_from_kurashiru(url: str):
+# 一括取り込み時の同時取得数と、同じドメインへのリクエスト開始間隔（秒）
+SCRAPE_BULK_CONCURRENCY = int(environ.get("SCRAPE_BULK_CONCURRENCY", "8"))
+SCRAPE_DOMAIN_DELAY = float(environ.get("SCRAPE_DOMAIN_DELAY", "0.5"))
+
+# 取得したHTMLのキャッシュ（保存先・再検証なしで使う期間・合計サイズの上限）
+SCRAPE_CACHE_DIR = environ.get("SCRAPE_CACHE_DIR", "/workspace/uploads/scrape_cache")
+SCRAPE_CACHE_TTL = float(environ.get("SCRAPE_CACHE_TTL_HOURS", "24")) * 3600
+SCRAPE_CACHE_MAX_BYTES = int(environ.get("SCRAPE_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+# ドメインごとの次にリクエストを開始してよい時刻（イベントループの時刻）
+_domain_next_request: Dict[str, float] = {}
+
+scrape_cache = DiskCache(SCRAPE_CACHE_DIR, SCRAPE_CACHE_MAX_BYTES, SCRAPE_CACHE_TTL, name="scrape_cache")
+
+def _decode(entry: DiskCacheEntry) -> str:
+    return entry.value.decode(entry.meta.get("encoding") or "utf-8", errors="replace")
+
+async def fetch_html(url: str) -> str:
+    """HTMLを取得（キャッシュが新しければ通信せず、期限切れならETag/Last-Modifiedで再検証）"""
+    entry = await scrape_cache.get(url)
+    if entry is not None and scrape_cache.is_fresh(entry):
+        metrics.inc("scrape_cache.hits")
+        return _decode(entry)
+
+    headers = {}
+    if entry is not None:
+        if entry.meta.get("etag"):
+            headers["If-None-Match"] = entry.meta["etag"]
+        headers["If-Modified-Since"] = entry.meta.get("last_modified") or formatdate(entry.stored_at, usegmt=True)
+
+    response = await http_client.fetch(url, headers=headers, allow_not_modified=entry is not None)
+    if response.status_code == 304 and entry is not None:
+        metrics.inc("scrape_cache.revalidated")
+        await scrape_cache.touch(url, entry)
+        return _decode(entry)
+
+    metrics.inc("scrape_cache.misses")
+    await scrape_cache.set(url, response.content, {
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "encoding": response.encoding,
+    })
+    return response.text
+
+async def scrape_recipe(url: str):
+    """URLのレシピをスクレイピング（解析はホスト名ごとに登録したパーサーで行う）
+
+    HTTP取得は共有の非同期クライアント（と取得済みHTMLのキャッシュ）で行い、
+    HTML解析はイベントループを塞がないようにスレッドで実行する
     """
-    クラシルのレシピページから情報を取得する
-    
-    Args:
-        url (str): クラシルのレシピページURL
-    
-    Returns:
-        dict: レシピ情報を含む辞書
+    print(f"スクレイピング開始: {url}, ドメイン: {urlparse(url).netloc.lower()}")
+    site_parsers.ensure_supported(url)
+    html = await fetch_html(url)
+    return await asyncio.to_thread(site_parsers.parse_recipe, html, url)
+
+def reparse_cached_pages() -> Iterator[Tuple[str, object]]:
+    """キャッシュ済みのHTMLを現在のパーサーで解析し直す（オフライン用、通信しない）
+
+    (URL, 解析結果または例外) を順に返す
     """
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
-    # タイトルを取得
-    title_element = soup.find('h1', class_='title')
-    title = title_element.text.strip() if title_element else ""
-    
-    # 材料リストを取得
-    ingredients = []
-    ingredient_section = soup.find('section', class_='ingredients')
-    if ingredient_section:
-        ingredient_items = ingredient_section.find_all('li', class_='ingredient-list-item')
-        for item in ingredient_items:
-            # グループタイトルは除外
-            if 'group-title' in item.get('class', []):
-                continue
-            
-            name_element = item.find('a', class_='ingredient-name')
-            quantity_element = item.find('span', class_='ingredient-quantity-amount')
-            
-            if name_element and quantity_element:
-                ingredient_text = f"{name_element.text.strip()} {quantity_element.text.strip()}"
-                ingredients.append(ingredient_text)
-    
-    # 手順を取得
-    steps = []
-    instructions_section = soup.find('section', class_='instructions')
-    if instructions_section:
-        step_items = instructions_section.find_all('li', class_='instruction-list-item')
-        for item in step_items:
-            content_element = item.find('span', class_='content')
-            if content_element:
-                steps.append(content_element.text.strip())
-    
-    # 最初の画像を取得（動画のポスター画像）
-    photo_url = ""
-    video_tag = soup.find("video")
-    if video_tag:
-        photo_url = video_tag.get("poster", "")
-    
-    return {
-        "title": title,
-        "source_url": url,
-        "ingredients": ingredients,
-        "steps": steps,
-        "photo_url": photo_url
-    }
-
-def scrape_recipe(url: str):
-    """URLパターンに基づいて適切なスクレイピングメソッドを選択"""
-    parsed_url = urlparse(url)
-    domain = parsed_url.netloc.lower()
-    
-    print(f"スクレイピング開始: {url}, ドメイン: {domain}")
-    
-    if "delishkitchen.tv" in domain:
-        return scrape_recipe_from_delish(url)
-    elif "cookpad.com" in domain:
-        # Cookpadは現在対応していないため、エラーを返す
-        raise ValueError("Cookpadは現在対応していません")
-    elif "kurashiru.com" in domain or "www.kurashiru.com" in domain:
-        return scrape_recipe_from_kurashiru(url)
-    else:
-        raise ValueError(f"サポートされていないドメインです: {domain}")
\ No newline at end of file
+    for entry in scrape_cache.iter_entries():
+        try:
+            yield entry.key, site_parsers.parse_recipe(_decode(entry), entry.key)
+        except Exception as e:
+            yield entry.key, e
+
+async def _wait_for_domain_slot(url: str) -> None:
+    """同じドメインへのリクエスト開始間隔をSCRAPE_DOMAIN_DELAY秒以上空ける"""
+    domain = urlparse(url).netloc.lower()
+    loop = asyncio.get_running_loop()
+    now = loop.time()
+    # 待つ前に開始時刻を予約するので、同時に呼ばれても間隔が保たれる
+    start = max(now, _domain_next_request.get(domain, 0.0))
+    _domain_next_request[domain] = start + SCRAPE_DOMAIN_DELAY
+    if start > now:
+        await asyncio.sleep(start - now)
+
+async def scrape_recipes(urls: List[str]) -> List:
+    """複数URLを並行してスクレイピング
+
+    全体の同時取得数はSCRAPE_BULK_CONCURRENCY、ドメインごとの同時接続数は共有クライアントの設定に従う。
+    結果は入力順で、失敗したURLは例外オブジェクトが入る
+    """
+    slots = asyncio.Semaphore(SCRAPE_BULK_CONCURRENCY)
+
+    async def scrape_one(url: str):
+        # 間隔待ちの間は枠を占有しないので、他ドメインの取得は止まらない
+        await _wait_for_domain_slot(url)
+        async with slots:
+            return await scrape_recipe(url)
+
+    return await asyncio.gather(*(scrape_one(url) for url in urls), return_exceptions=True)
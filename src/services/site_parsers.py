@@ -0,0 +1,216 @@
+import html as html_lib
+import json
+import re
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup, SoupStrainer
+from src.services.metrics import metrics
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# パーサーの型: (HTML, URL) -> レシピ情報の辞書（title, source_url, ingredients, steps, photo_url）
+SiteParser = Callable[[str, str], dict]
+
+# ホスト名（完全一致）ごとのパーサー
+_PARSERS: Dict[str, SiteParser] = {}
+# 対応しないと明示しているサイト（取得前に弾く）
+_UNSUPPORTED: Dict[str, str] = {
+    "cookpad.com": "Cookpadは現在対応していません",
+    "www.cookpad.com": "Cookpadは現在対応していません",
+}
+
+# DOMを組み立てずにJSON-LDのscriptブロックだけを取り出す
+_JSON_LD_PATTERN = re.compile(
+    r"<script[^>]+type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+def register_parser(*hostnames: str):
+    """ホスト名に対応するパーサーを登録するデコレーター"""
+    def decorator(parser: SiteParser) -> SiteParser:
+        for hostname in hostnames:
+            _PARSERS[hostname.lower()] = parser
+        return parser
+    return decorator
+
+def _hostname(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+def get_parser(url: str) -> Optional[SiteParser]:
+    return _PARSERS.get(_hostname(url))
+
+def ensure_supported(url: str) -> None:
+    """取得前に対応外と分かっているURLを弾く（ValueError）"""
+    message = _UNSUPPORTED.get(_hostname(url))
+    if message:
+        raise ValueError(message)
+
+def _soup(html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only)
+
+def _text(value) -> str:
+    return html_lib.unescape(str(value)).strip()
+
+def _is_recipe(node: dict) -> bool:
+    node_type = node.get("@type")
+    return node_type == "Recipe" or (isinstance(node_type, list) and "Recipe" in node_type)
+
+def _find_recipe_node(data) -> Optional[dict]:
+    """JSON-LDのデータ（配列・@graphを含む）からRecipeを探す"""
+    if isinstance(data, list):
+        for item in data:
+            found = _find_recipe_node(item)
+            if found is not None:
+                return found
+    elif isinstance(data, dict):
+        if _is_recipe(data):
+            return data
+        if "@graph" in data:
+            return _find_recipe_node(data["@graph"])
+    return None
+
+def _instructions(value) -> List[str]:
+    """recipeInstructions（文字列・HowToStep・HowToSectionの入れ子）を手順のリストにする"""
+    if isinstance(value, str):
+        return [line for line in (_text(part) for part in value.splitlines()) if line]
+    if isinstance(value, list):
+        steps = []
+        for item in value:
+            steps.extend(_instructions(item))
+        return steps
+    if isinstance(value, dict):
+        if "itemListElement" in value:
+            return _instructions(value["itemListElement"])
+        text = value.get("text") or value.get("name")
+        return [_text(text)] if text else []
+    return []
+
+def _image_url(value) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list) and value:
+        return _image_url(value[0])
+    if isinstance(value, dict):
+        return value.get("url") or value.get("contentUrl") or ""
+    return ""
+
+def extract_json_ld_recipe(html: str, url: str) -> Optional[dict]:
+    """schema.orgのRecipe（JSON-LD）からレシピ情報を取得（見つからなければNone）"""
+    for match in _JSON_LD_PATTERN.finditer(html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        node = _find_recipe_node(data)
+        if node is None:
+            continue
+        ingredients = [_text(item) for item in node.get("recipeIngredient") or node.get("ingredients") or []]
+        steps = _instructions(node.get("recipeInstructions"))
+        if not node.get("name") or not ingredients or not steps:
+            continue
+        return {
+            "title": _text(node["name"]),
+            "source_url": url,
+            "ingredients": ingredients,
+            "steps": steps,
+            "photo_url": _image_url(node.get("image")),
+        }
+    return None
+
+def parse_recipe(html: str, url: str) -> dict:
+    """
+    ホスト名に対応するパーサーでレシピを解析する
+
+    登録済みのサイトはサイト専用のDOM解析を行う（従来どおりの結果）。
+    未登録のサイトはJSON-LDのRecipeがあれば取り込む
+    """
+    ensure_supported(url)
+    parser = get_parser(url)
+    if parser is not None:
+        with metrics.timer(f"scrape.parse.{parser.__name__}"):
+            return parser(html, url)
+    with metrics.timer("scrape.parse.json_ld"):
+        recipe = extract_json_ld_recipe(html, url)
+    if recipe is None:
+        raise ValueError(f"サポートされていないドメインです: {urlparse(url).netloc.lower()}")
+    return recipe
+
+@register_parser("delishkitchen.tv", "www.delishkitchen.tv")
+def delishkitchen(html: str, url: str) -> dict:
+    soup = _soup(html)
+
+    title = soup.find('h1').text  # タイトルを取得
+    ingredients = [ingredient.text for ingredient in soup.find_all(class_='ingredient')]  # 材料リスト
+    steps = [step.text.strip() for step in soup.find_all("p", {"class": "step-desc"})]  # 手順
+    # 最初の画像を取得
+    video_tag = soup.find("video")  # 最初の<video>タグを取得
+    photo_url = None
+    if video_tag:
+        photo_url = video_tag.get("poster")  # poster属性から画像URLを取得
+    return {"title": title, "source_url": url, "ingredients": ingredients, "steps": steps, "photo_url": photo_url}
+
+# クラシルのページで使う要素だけを木にする
+_KURASHIRU_STRAINER = SoupStrainer(["h1", "section", "video"])
+
+@register_parser("kurashiru.com", "www.kurashiru.com")
+def kurashiru(html: str, url: str) -> dict:
+    """
+    クラシルのレシピページから情報を取得する
+
+    Args:
+        html (str): 取得済みのレシピページHTML
+        url (str): クラシルのレシピページURL
+
+    Returns:
+        dict: レシピ情報を含む辞書
+    """
+    soup = _soup(html, _KURASHIRU_STRAINER)
+
+    # タイトルを取得
+    title_element = soup.find('h1', class_='title')
+    title = title_element.text.strip() if title_element else ""
+
+    # 材料リストを取得
+    ingredients = []
+    ingredient_section = soup.find('section', class_='ingredients')
+    if ingredient_section:
+        ingredient_items = ingredient_section.find_all('li', class_='ingredient-list-item')
+        for item in ingredient_items:
+            # グループタイトルは除外
+            if 'group-title' in item.get('class', []):
+                continue
+
+            name_element = item.find('a', class_='ingredient-name')
+            quantity_element = item.find('span', class_='ingredient-quantity-amount')
+
+            if name_element and quantity_element:
+                ingredient_text = f"{name_element.text.strip()} {quantity_element.text.strip()}"
+                ingredients.append(ingredient_text)
+
+    # 手順を取得
+    steps = []
+    instructions_section = soup.find('section', class_='instructions')
+    if instructions_section:
+        step_items = instructions_section.find_all('li', class_='instruction-list-item')
+        for item in step_items:
+            content_element = item.find('span', class_='content')
+            if content_element:
+                steps.append(content_element.text.strip())
+
+    # 最初の画像を取得（動画のポスター画像）
+    photo_url = ""
+    video_tag = soup.find("video")
+    if video_tag:
+        photo_url = video_tag.get("poster", "")
+
+    return {
+        "title": title,
+        "source_url": url,
+        "ingredients": ingredients,
+        "steps": steps,
+        "photo_url": photo_url
+    }
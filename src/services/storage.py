@@ -0,0 +1,207 @@
+import asyncio
+import mimetypes
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from os import environ
+from typing import Dict, List, Optional
+import src.services.image as services_image
+
+# 写真の保存先（local: ローカルディスク / s3: S3互換オブジェクトストレージ）
+PHOTO_STORAGE_BACKEND = environ.get("PHOTO_STORAGE_BACKEND", "local")
+PHOTO_UPLOAD_DIR = environ.get("PHOTO_UPLOAD_DIR", "/workspace/uploads/photos")
+# S3互換ストレージの設定（S3_ENDPOINT_URLを指定するとMinIO等のローカル環境にも接続できる）
+S3_BUCKET = environ.get("S3_BUCKET", "")
+S3_PREFIX = environ.get("S3_PREFIX", "photos/")
+S3_ENDPOINT_URL = environ.get("S3_ENDPOINT_URL") or None
+S3_REGION = environ.get("S3_REGION") or None
+S3_PRESIGN_EXPIRES = int(environ.get("S3_PRESIGN_EXPIRES", "3600"))
+# この大きさを超えるファイルはマルチパートでアップロードする
+S3_MULTIPART_THRESHOLD = int(environ.get("S3_MULTIPART_THRESHOLD", 8 * 1024 * 1024))
+
+# 内容のSHA-256をファイル名にした画像（派生画像を含む）は内容が変わらないため長期キャッシュさせる
+HASHED_FILENAME_PATTERN = re.compile(r"^[0-9a-f]{64}(_\d+)?\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+class PhotoStorage(ABC):
+    """写真ファイルの保存先のインターフェース（キーはファイル名）
+
+    アップロードや派生画像の生成はwork_dir上のローカルファイルで行い、
+    put_file()で保存先に移す
+    """
+
+    work_dir: str
+
+    @abstractmethod
+    async def put_file(self, local_path: str, key: str) -> None:
+        """ローカルファイルを保存先に移す（元のファイルは残らない）"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    def local_path(self, key: str) -> Optional[str]:
+        """ローカルディスク上のパス（ローカル以外の保存先はNone）"""
+        return None
+
+    async def signed_url(self, key: str) -> Optional[str]:
+        """クライアントが直接取得できる署名付きURL（非対応の保存先はNone）"""
+        return None
+
+class LocalPhotoStorage(PhotoStorage):
+    """ローカルディスクに保存（作業ディレクトリも同じ場所にしてos.replaceで確定する）"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.work_dir = root
+        os.makedirs(root, exist_ok=True)
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    async def put_file(self, local_path: str, key: str) -> None:
+        target = self.local_path(key)
+        if os.path.abspath(local_path) != os.path.abspath(target):
+            os.replace(local_path, target)
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    async def delete(self, key: str) -> None:
+        path = self.local_path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+class S3PhotoStorage(PhotoStorage):
+    """S3互換のオブジェクトストレージに保存
+
+    boto3は同期APIなのでスレッドで実行する。配信は署名付きURLへのリダイレクトで行い、
+    画像の本体はAPIサーバーを経由しない
+    """
+
+    def __init__(self, bucket: str, prefix: str, endpoint_url: Optional[str], region: Optional[str]):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.exceptions import ClientError
+        except ImportError as e:
+            raise RuntimeError("PHOTO_STORAGE_BACKEND=s3 requires the 'boto3' package") from e
+        if not bucket:
+            raise ValueError("PHOTO_STORAGE_BACKEND=s3 requires S3_BUCKET")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.work_dir = tempfile.gettempdir()
+        self._client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self._transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=S3_MULTIPART_THRESHOLD,
+        )
+        self._client_error = ClientError
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _upload(self, local_path: str, key: str) -> None:
+        extra_args = {"ContentType": mimetypes.guess_type(key)[0] or "application/octet-stream"}
+        if HASHED_FILENAME_PATTERN.match(key):
+            extra_args["CacheControl"] = IMMUTABLE_CACHE_CONTROL
+        self._client.upload_file(
+            local_path, self.bucket, self._object_key(key),
+            ExtraArgs=extra_args, Config=self._transfer_config,
+        )
+
+    async def put_file(self, local_path: str, key: str) -> None:
+        try:
+            await asyncio.to_thread(self._upload, local_path, key)
+        finally:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._exists, key)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._client.delete_object, Bucket=self.bucket, Key=self._object_key(key))
+
+    async def signed_url(self, key: str) -> str:
+        return await asyncio.to_thread(
+            self._client.generate_presigned_url,
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._object_key(key)},
+            ExpiresIn=S3_PRESIGN_EXPIRES,
+        )
+
+def create_storage() -> PhotoStorage:
+    if PHOTO_STORAGE_BACKEND == "local":
+        return LocalPhotoStorage(PHOTO_UPLOAD_DIR)
+    if PHOTO_STORAGE_BACKEND == "s3":
+        return S3PhotoStorage(S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL, S3_REGION)
+    raise ValueError(f"Unknown PHOTO_STORAGE_BACKEND: {PHOTO_STORAGE_BACKEND}")
+
+photo_storage = create_storage()
+
+@dataclass
+class StoredPhoto:
+    filename: str
+    width: int
+    height: int
+    derivatives: Dict[int, str]
+
+def photo_filenames(filename: str) -> List[str]:
+    """元画像と派生画像のファイル名"""
+    stem = os.path.splitext(filename)[0]
+    return [filename] + [
+        services_image.derivative_filename(stem, size) for size in services_image.PHOTO_DERIVATIVE_SIZES
+    ]
+
+async def store_photo(temp_path: str, sha256: str, extension: str) -> StoredPhoto:
+    """
+    work_dir上の一時ファイルを内容のハッシュ名で保存し、不足している派生画像を生成する
+
+    同じ内容のファイルが既にあれば一時ファイルは破棄して既存のものを使う。
+    参照数による削除と競合しないよう、参照（recipe_photosの行）をflushした後・commit前に呼ぶこと
+    （crud_recipe.create_recipe_photo / replace_photo_urlのstore_file）
+    """
+    filename = f"{sha256}{extension}"
+    generated: Dict[int, str] = {}
+    try:
+        missing_sizes = [
+            size for size in services_image.PHOTO_DERIVATIVE_SIZES
+            if not await photo_storage.exists(services_image.derivative_filename(sha256, size))
+        ]
+        width, height, derivatives, generated = await services_image.generate_derivatives_async(
+            temp_path, photo_storage.work_dir, sha256, missing_sizes
+        )
+        # 一時ファイルから置き換えるので、配信中のファイルが書きかけになることはない
+        for size, generated_path in generated.items():
+            await photo_storage.put_file(generated_path, derivatives[size])
+
+        if await photo_storage.exists(filename):
+            os.remove(temp_path)
+        else:
+            await photo_storage.put_file(temp_path, filename)
+    finally:
+        for path in [temp_path, *generated.values()]:
+            if os.path.exists(path):
+                os.remove(path)
+    return StoredPhoto(filename=filename, width=width, height=height, derivatives=derivatives)
+
+async def remove_photo(filename: str) -> None:
+    """元画像と派生画像を保存先から削除"""
+    for name in photo_filenames(filename):
+        await photo_storage.delete(name)
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional
+import aiofiles
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Content-Lengthによる事前チェックで許容するmultipartのヘッダー・境界文字列分
+MULTIPART_OVERHEAD = 64 * 1024
+# 種別判定に必要な先頭バイト数
+SNIFF_LENGTH = 12
+
+class UploadTooLargeError(Exception):
+    """アップロードが上限サイズを超えた"""
+
+class UnsupportedImageError(Exception):
+    """対応していない画像形式（先頭バイトで判定）"""
+
+class MissingUploadError(Exception):
+    """指定したフィールドのファイルが含まれていない"""
+
+@dataclass
+class ReceivedUpload:
+    temp_path: str
+    size: int
+    sha256: str
+    extension: str
+    filename: Optional[str] = None
+
+def sniff_image_extension(head: bytes) -> Optional[str]:
+    """先頭バイト（マジックナンバー）から画像形式の拡張子を判定"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+async def receive_image_upload(request: Request, field_name: str, temp_dir: str, max_size: int) -> ReceivedUpload:
+    """
+    multipart/form-dataのリクエストボディを逐次読み込み、指定フィールドの画像を一時ファイルに書き出す
+
+    ボディ全体をメモリやスプールに溜めず、上限を超えた時点で読み込みを中断する。
+    併せてSHA-256の計算と先頭バイトによる画像形式の判定を行う。
+    一時ファイルはtemp_dirに作成するため、同じファイルシステム上にos.replaceで確定できる
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise UploadTooLargeError("File too large")
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise MissingUploadError("multipart/form-data with a file is required")
+
+    part = {"headers": {}, "field": b"", "value": b"", "target": False, "filename": None}
+    pieces: List[bytes] = []
+    found = {"target": False, "filename": None}
+
+    def on_part_begin():
+        part.update(headers={}, field=b"", value=b"", target=False)
+
+    def on_header_field(data, start, end):
+        part["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][part["field"].lower()] = part["value"]
+        part["field"], part["value"] = b"", b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        if disposition.get(b"name", b"").decode() == field_name and not found["target"]:
+            part["target"] = True
+            found["target"] = True
+            filename = disposition.get(b"filename")
+            found["filename"] = filename.decode(errors="replace") if filename else None
+
+    def on_part_data(data, start, end):
+        if part["target"]:
+            pieces.append(data[start:end])
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+
+    temp_path = os.path.join(temp_dir, f".upload-{uuid.uuid4().hex}.tmp")
+    hasher = hashlib.sha256()
+    size = 0
+    head = b""
+    extension = None
+    try:
+        async with aiofiles.open(temp_path, "wb") as f:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                for piece in pieces:
+                    size += len(piece)
+                    if size > max_size:
+                        raise UploadTooLargeError("File too large")
+                    if extension is None:
+                        head = (head + piece)[:SNIFF_LENGTH]
+                        if len(head) >= SNIFF_LENGTH:
+                            extension = sniff_image_extension(head)
+                            if extension is None:
+                                raise UnsupportedImageError("Unsupported image type")
+                    hasher.update(piece)
+                    await f.write(piece)
+                pieces.clear()
+            parser.finalize()
+
+        if not found["target"] or size == 0:
+            raise MissingUploadError("No file provided")
+        if extension is None:
+            # SNIFF_LENGTHに満たない極小ファイル
+            extension = sniff_image_extension(head)
+            if extension is None:
+                raise UnsupportedImageError("Unsupported image type")
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return ReceivedUpload(
+        temp_path=temp_path,
+        size=size,
+        sha256=hasher.hexdigest(),
+        extension=extension,
+        filename=found["filename"],
+    )
@@ -0,0 +1,88 @@
+import ipaddress
+import os
+import tempfile
+
+# src配下のモジュールは読み込み時に環境変数を参照するため、importより前に設定する
+_work_dir = tempfile.mkdtemp(prefix="cooking-memo-test-")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("PHOTO_STORAGE_BACKEND", "local")
+os.environ.setdefault("PHOTO_UPLOAD_DIR", os.path.join(_work_dir, "photos"))
+os.environ.setdefault("SCRAPE_CACHE_DIR", os.path.join(_work_dir, "scrape_cache"))
+os.environ.setdefault("OCR_CACHE_DIR", os.path.join(_work_dir, "ocr_cache"))
+os.environ.setdefault("OCR_JOB_DIR", os.path.join(_work_dir, "ocr_jobs"))
+os.environ.setdefault("SCRAPE_DOMAIN_DELAY", "0")
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from src.db import Base, get_db
+from src.main import app
+from src.models.recipe import PhotoType, SourceType
+from src.services import http_client
+from src.services import photo_fetch
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+def fake_dns(monkeypatch):
+    """名前解決を固定する（IPアドレスはそのまま、localhostはループバック、それ以外は公開アドレス）"""
+    async def resolve(host: str, port: int):
+        if host == "localhost":
+            return ["127.0.0.1"]
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            return ["93.184.216.34"]
+
+    monkeypatch.setattr(http_client, "_resolve_host", resolve)
+
+@pytest.fixture
+async def db_sessionmaker(tmp_path):
+    """テストごとに作り直すSQLiteのDB（マスターデータは02_test_user.sqlと同じ）"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, autoflush=False)
+    async with session_factory() as session:
+        session.add_all([
+            SourceType(id=1, code="web", name="ウェブサイト"),
+            SourceType(id=2, code="book", name="書籍"),
+            SourceType(id=3, code="original", name="オリジナル"),
+            PhotoType(id=1, code="scraped", name="スクレイピング", is_reference=True),
+            PhotoType(id=2, code="book", name="書籍", is_reference=True),
+            PhotoType(id=3, code="my_photo", name="自分の写真", is_reference=False),
+        ])
+        await session.commit()
+    yield session_factory
+    await engine.dispose()
+
+@pytest.fixture
+async def client(db_sessionmaker):
+    async def override_get_db():
+        async with db_sessionmaker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+    photo_fetch.shutdown()
+
+@pytest.fixture
+def external_pages(monkeypatch):
+    """外部サイトへの取得をURL→HTMLの辞書で差し替える（登録のないURLは404）"""
+    pages = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        html = pages.get(str(request.url))
+        if html is None:
+            return httpx.Response(404, request=request)
+        return httpx.Response(200, text=html, headers={"Content-Type": "text/html; charset=utf-8"}, request=request)
+
+    monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return pages
@@ -0,0 +1,46 @@
+import io
+import zipfile
+from datetime import date
+import pytest
+from src.cruds import recipe as crud_recipe
+from src.routers import recipe as recipe_router
+
+def _zip_of_pages(count: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(count):
+            archive.writestr(f"page{i:02d}.png", b"\x89PNG\r\n\x1a\n" + bytes(16))
+    return buffer.getvalue()
+
+@pytest.mark.anyio
+async def test_create_many_from_book_photos_returns_saved_recipes(db_sessionmaker):
+    recipes_data = [
+        {"title": "肉じゃが", "ingredients": ["じゃがいも 2個"], "steps": ["煮る"]},
+        {"title": "味噌汁", "ingredients": ["味噌 大さじ1"], "steps": ["溶く"]},
+    ]
+    async with db_sessionmaker() as session:
+        recipes = await crud_recipe.create_many_from_book_photos(
+            session, recipes_data=recipes_data, cooking_date=date(2025, 6, 1), source_pages=[10, 11]
+        )
+    assert [recipe.title for recipe in recipes] == ["肉じゃが", "味噌汁"]
+    assert [recipe.source_page for recipe in recipes] == [10, 11]
+
+@pytest.mark.anyio
+async def test_book_photo_batch_rejects_too_many_pages(client, monkeypatch):
+    monkeypatch.setattr(recipe_router, "BOOK_PHOTO_MAX_PAGES", 2)
+    response = await client.post(
+        "/recipe/book-photo/batch",
+        data={"cooking_date": "2025-06-01"},
+        files={"photos": ("pages.zip", _zip_of_pages(3), "application/zip")},
+    )
+    assert response.status_code == 413
+
+@pytest.mark.anyio
+async def test_book_photo_batch_rejects_large_file(client, monkeypatch):
+    monkeypatch.setattr(recipe_router, "BOOK_PHOTO_MAX_FILE_SIZE", 1024)
+    response = await client.post(
+        "/recipe/book-photo/batch",
+        data={"cooking_date": "2025-06-01"},
+        files={"photos": ("page.png", b"\x89PNG\r\n\x1a\n" + bytes(2048), "image/png")},
+    )
+    assert response.status_code == 413
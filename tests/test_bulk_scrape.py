@@ -0,0 +1,42 @@
+import json
+import os
+import pytest
+from sqlalchemy import func, select
+from src.models.recipe import Recipe
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "fixtures")
+
+def _load_fixtures():
+    with open(os.path.join(FIXTURE_DIR, "manifest.json"), encoding="utf-8") as f:
+        cases = json.load(f)
+    for case in cases:
+        with open(os.path.join(FIXTURE_DIR, case["file"]), encoding="utf-8") as f:
+            case["html"] = f.read()
+    return cases
+
+async def _recipe_count(db_sessionmaker) -> int:
+    async with db_sessionmaker() as session:
+        return await session.scalar(select(func.count(Recipe.id)))
+
+@pytest.mark.anyio
+async def test_bulk_scrape_reports_created_and_does_not_duplicate_on_retry(client, db_sessionmaker, external_pages):
+    cases = _load_fixtures()
+    for case in cases:
+        external_pages[case["url"]] = case["html"]
+    missing_url = "https://recipes.example.com/not-found"
+    urls = [case["url"] for case in cases] + [cases[0]["url"], missing_url]
+
+    response = await client.post("/recipe/scrape/bulk", json={"source_urls": urls, "cooking_date": "2025-06-01"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["source_url"] for result in results] == urls
+    assert [result["status"] for result in results] == ["created"] * len(cases) + ["duplicate", "failed"]
+    assert all(result["recipe_id"] for result in results[:len(cases)])
+    assert await _recipe_count(db_sessionmaker) == len(cases)
+
+    # 再送しても登録済みとして扱われ、レシピは増えない
+    response = await client.post("/recipe/scrape/bulk", json={"source_urls": urls, "cooking_date": "2025-06-02"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["existing"] * len(cases) + ["duplicate", "failed"]
+    assert await _recipe_count(db_sessionmaker) == len(cases)
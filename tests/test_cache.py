@@ -0,0 +1,102 @@
+from datetime import date
+import pytest
+from src.cruds import recipe as crud_recipe
+from src.services import cache
+from src.services.cache import MemoryCacheBackend, ResponseCache
+
+class UnavailableBackend(MemoryCacheBackend):
+    """接続できないキャッシュサーバーを模したバックエンド"""
+
+    async def mget(self, keys):
+        raise ConnectionRefusedError("cache server is down")
+
+    async def set(self, key, value, ttl):
+        raise ConnectionRefusedError("cache server is down")
+
+    async def delete(self, key):
+        raise ConnectionRefusedError("cache server is down")
+
+    async def incr(self, key, ttl=None):
+        raise ConnectionRefusedError("cache server is down")
+
+@pytest.fixture
+def unavailable_backend(monkeypatch):
+    backend = UnavailableBackend(10)
+    for response_cache in (cache.recipe_detail_cache, cache.tag_list_cache, cache.calendar_month_cache):
+        monkeypatch.setattr(response_cache, "backend", backend)
+    return backend
+
+@pytest.mark.anyio
+async def test_set_and_get_round_trip():
+    response_cache = ResponseCache(MemoryCacheBackend(10), "test", 60)
+    await response_cache.set(1, b"body", await response_cache.token(1))
+    assert await response_cache.get(1) == b"body"
+
+@pytest.mark.anyio
+async def test_invalidation_during_read_skips_write():
+    response_cache = ResponseCache(MemoryCacheBackend(10), "test", 60)
+    token = await response_cache.token(1)
+    await response_cache.delete(1)
+    await response_cache.set(1, b"stale", token)
+    assert await response_cache.get(1) is None
+
+@pytest.mark.anyio
+async def test_backend_errors_fail_open():
+    response_cache = ResponseCache(UnavailableBackend(10), "test", 60)
+    assert await response_cache.get(1) is None
+    await response_cache.set(1, b"body", await response_cache.token(1))
+    await response_cache.set(1, b"body")
+    await response_cache.delete(1)
+    await response_cache.clear()
+
+@pytest.mark.anyio
+async def test_committed_write_succeeds_when_invalidation_fails(db_sessionmaker, unavailable_backend):
+    async with db_sessionmaker() as session:
+        recipes = await crud_recipe.create_many_from_book_photos(
+            session,
+            recipes_data=[{"title": "肉じゃが", "ingredients": ["じゃがいも 2個"], "steps": ["煮る"]}],
+            cooking_date=date(2025, 6, 1),
+        )
+    assert [recipe.title for recipe in recipes] == ["肉じゃが"]
+
+@pytest.mark.anyio
+async def test_cached_get_is_served_from_db_when_cache_is_down(client, unavailable_backend):
+    response = await client.get("/tags")
+    assert response.status_code == 200
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryCacheBackend(10)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    backend = cache.RedisCacheBackend("redis://localhost:6379/0")
+    backend._client = fakeredis.FakeAsyncRedis()
+    return backend
+
+@pytest.mark.anyio
+async def test_set_if_unchanged_compares_watched_keys(backend):
+    assert await backend.set_if_unchanged("value", b"a", 60, ["gen", "marker"], [b"0", b"0"])
+    assert await backend.mget(["value"]) == [b"a"]
+
+    await backend.incr("marker")
+    assert not await backend.set_if_unchanged("value", b"b", 60, ["gen", "marker"], [b"0", b"0"])
+    assert await backend.mget(["value"]) == [b"a"]
+    assert await backend.set_if_unchanged("value", b"c", 60, ["gen", "marker"], [b"0", b"1"])
+    assert await backend.mget(["value"]) == [b"c"]
+
+@pytest.mark.anyio
+async def test_invalidation_between_token_and_set_is_not_overwritten(backend):
+    response_cache = ResponseCache(backend, "test", 60)
+    token = await response_cache.token(1)
+    await response_cache.clear()
+    await response_cache.set(1, b"stale", token)
+    assert await response_cache.get(1) is None
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class GetOnlyBackend(cache.CacheBackend):
+        async def mget(self, keys):
+            return [None] * len(keys)
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import event
+from src.cruds import recipe as crud_recipe
+
+START = date(2025, 6, 1)
+# 期間で絞り込むエンドポイント（/calendar/monthは/calendarと同じクエリをキャッシュ越しに使う）
+DATE_FILTERED_URLS = (
+    "/recipes/range?from=2025-06-01&to=2025-06-30",
+    "/recipes/range/summary?from=2025-06-01&to=2025-06-30",
+    "/calendar?from=2025-06-01&to=2025-06-30",
+    "/cooking-records/month/2025-06",
+    "/cooking-records/month/2025-06/summary",
+    "/recipes/date/2025-06-01",
+)
+
+async def _seed(db_sessionmaker, first_day: int, days: int) -> None:
+    async with db_sessionmaker() as session:
+        for offset in range(first_day, first_day + days):
+            await crud_recipe.create_many_from_book_photos(
+                session,
+                recipes_data=[{"title": f"献立{offset}", "ingredients": ["じゃがいも 2個", "玉ねぎ 1個"], "steps": ["切る", "煮る"]}],
+                cooking_date=START + timedelta(days=offset),
+            )
+
+@pytest.fixture
+def sql_statements(db_sessionmaker):
+    """実行されたSQL文と引数を記録する"""
+    engine = db_sessionmaker.kw["bind"]
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+async def _query_counts(client, sql_statements) -> dict:
+    counts = {}
+    for url in DATE_FILTERED_URLS:
+        sql_statements.clear()
+        response = await client.get(url)
+        assert response.status_code == 200, response.text
+        assert response.json()
+        counts[url] = len(sql_statements)
+    return counts
+
+@pytest.mark.anyio
+async def test_query_count_does_not_grow_with_rows(client, db_sessionmaker, sql_statements):
+    await _seed(db_sessionmaker, 0, 2)
+    few = await _query_counts(client, sql_statements)
+    await _seed(db_sessionmaker, 2, 8)
+    many = await _query_counts(client, sql_statements)
+
+    assert few == many
+    # 関連データはリレーションごとに1回のSELECT ... IN でまとめて読む
+    assert max(many.values()) <= 8
+
+@pytest.mark.anyio
+async def test_date_filters_use_cooking_date_index(client, db_sessionmaker, sql_statements):
+    await _seed(db_sessionmaker, 0, 3)
+    for url in DATE_FILTERED_URLS:
+        assert (await client.get(url)).status_code == 200
+    filtered = [(statement, parameters) for statement, parameters in sql_statements if "cooking_records.cooking_date >=" in statement]
+    assert filtered
+
+    async with db_sessionmaker.kw["bind"].connect() as connection:
+        for statement, parameters in filtered:
+            plan = [row[-1] for row in await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            assert any(
+                line.startswith("SEARCH cooking_records USING") and "ix_cooking_records_cooking_date (cooking_date>? AND cooking_date<?)" in line
+                for line in plan
+            ), plan
+            assert not any(line.startswith("SCAN cooking_records") for line in plan), plan
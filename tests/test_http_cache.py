@@ -0,0 +1,93 @@
+from datetime import date
+import pytest
+from sqlalchemy import event
+from src.cruds import recipe as crud_recipe
+
+# 手元のキャッシュより十分新しい日時（Last-Modifiedを比較していれば必ず304になる）
+FUTURE = "Fri, 01 Jan 2100 00:00:00 GMT"
+
+@pytest.fixture
+async def recipes(db_sessionmaker):
+    async with db_sessionmaker() as session:
+        created = await crud_recipe.create_many_from_book_photos(
+            session,
+            recipes_data=[
+                {"title": "肉じゃが", "ingredients": ["じゃがいも 2個"], "steps": ["煮る"]},
+                {"title": "唐揚げ", "ingredients": ["鶏もも肉 300g"], "steps": ["揚げる"]},
+            ],
+            cooking_date=date(2025, 6, 1),
+        )
+    return [recipe.id for recipe in created]
+
+async def _create_tag(client, name: str) -> int:
+    response = await client.post("/tag", json={"name": name})
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+@pytest.mark.anyio
+async def test_tag_list_is_not_304_after_tag_delete(client):
+    first = await _create_tag(client, "和食")
+    await _create_tag(client, "簡単")
+    response = await client.get("/tags")
+    etag = response.headers["etag"]
+    assert "last-modified" not in response.headers
+    assert (await client.get("/tags", headers={"If-None-Match": etag})).status_code == 304
+
+    assert (await client.delete(f"/tag/{first}")).status_code == 200
+
+    response = await client.get("/tags", headers={"If-Modified-Since": FUTURE})
+    assert response.status_code == 200
+    assert [tag["name"] for tag in response.json()] == ["簡単"]
+    assert (await client.get("/tags", headers={"If-None-Match": etag})).status_code == 200
+
+@pytest.mark.anyio
+async def test_recipe_detail_is_not_304_after_tag_removal(client, recipes):
+    recipe_id = recipes[1]
+    await _create_tag(client, "和食")
+    tag_id = await _create_tag(client, "揚げ物")
+    assert (await client.post(f"/recipe/{recipe_id}/tag/{tag_id}")).status_code == 200
+    response = await client.get(f"/recipes/{recipe_id}")
+    etag = response.headers["etag"]
+    assert "last-modified" not in response.headers
+    assert (await client.get(f"/recipes/{recipe_id}", headers={"If-None-Match": etag})).status_code == 304
+
+    assert (await client.delete(f"/recipe/{recipe_id}/tag/{tag_id}")).status_code == 200
+
+    response = await client.get(f"/recipes/{recipe_id}", headers={"If-Modified-Since": FUTURE})
+    assert response.status_code == 200
+    assert response.json()["tags"] == []
+    assert (await client.get(f"/recipes/{recipe_id}", headers={"If-None-Match": etag})).status_code == 200
+
+@pytest.mark.anyio
+async def test_recipe_list_is_not_304_after_recipe_delete(client, recipes):
+    response = await client.get("/recipes/summary")
+    etag = response.headers["etag"]
+    assert (await client.get("/recipes/summary", headers={"If-None-Match": etag})).status_code == 304
+
+    assert (await client.delete(f"/recipe/{recipes[0]}")).status_code == 200
+
+    response = await client.get("/recipes/summary", headers={"If-Modified-Since": FUTURE})
+    assert response.status_code == 200
+    assert [recipe["id"] for recipe in response.json()] == [recipes[1]]
+
+@pytest.mark.anyio
+async def test_recipes_version_reads_latest_update_from_index(db_sessionmaker):
+    async with db_sessionmaker() as session:
+        engine = session.bind
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await crud_recipe.get_recipes_version(session)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        (statement, parameters), = statements
+        connection = await session.connection()
+        plan = [row[-1] for row in await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+    for table in ("recipes", "ingredients", "steps", "recipe_photos", "cooking_records", "tags"):
+        assert f"SEARCH {table} USING COVERING INDEX ix_{table}_updated_at" in plan
@@ -0,0 +1,71 @@
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+import pytest
+from src.schemas.recipe import OcrJobStatus
+from src.services import ocr_jobs
+from src.services import ocr as services_ocr
+from src.services.ocr_executor import OcrQueueFullError
+
+RECIPE_DATA = {"title": "肉じゃが", "ingredients": ["じゃがいも 2個"], "steps": ["煮る"]}
+
+@pytest.fixture
+def job_dir(tmp_path, monkeypatch):
+    path = tmp_path / "ocr_jobs"
+    path.mkdir()
+    monkeypatch.setattr(ocr_jobs, "OCR_JOB_DIR", str(path))
+    monkeypatch.setattr(ocr_jobs, "_jobs", {})
+    return path
+
+def _write_job(job_dir, job_id: str, status: OcrJobStatus, age: timedelta) -> str:
+    path = job_dir / job_id
+    path.mkdir()
+    updated_at = datetime.now() - age
+    job = ocr_jobs.OcrJob(job_id=job_id, cooking_date=date(2025, 6, 1), status=status, updated_at=updated_at)
+    (path / ocr_jobs.STATUS_FILENAME).write_text(json.dumps(job.to_dict()))
+    (path / ocr_jobs.IMAGE_FILENAME).write_bytes(b"image")
+    return str(path)
+
+@pytest.mark.anyio
+async def test_job_waits_for_full_pool_instead_of_failing(job_dir, db_sessionmaker, monkeypatch):
+    attempts = []
+
+    async def extract(image_data):
+        attempts.append(image_data)
+        if len(attempts) < 3:
+            raise OcrQueueFullError("OCR queue is full")
+        return RECIPE_DATA
+
+    monkeypatch.setattr(services_ocr, "extract_recipe_from_book_photo_async", extract)
+    monkeypatch.setattr(ocr_jobs, "async_session", db_sessionmaker)
+    monkeypatch.setattr(ocr_jobs, "OCR_JOB_RETRY_DELAY", 0)
+
+    job = await ocr_jobs.create_job(b"page", cooking_date=date(2025, 6, 1))
+    job = await ocr_jobs.get_job(job.job_id, wait=5)
+
+    assert job.status == OcrJobStatus.succeeded
+    assert job.recipe_id is not None
+    assert len(attempts) == 3
+
+@pytest.mark.anyio
+async def test_sweep_cleans_up_jobs_left_by_a_previous_process(job_dir):
+    interrupted = _write_job(job_dir, "interrupted", OcrJobStatus.running, timedelta(hours=2))
+    active = _write_job(job_dir, "active", OcrJobStatus.pending, timedelta(minutes=1))
+    expired = _write_job(job_dir, "expired", OcrJobStatus.succeeded, ocr_jobs.OCR_JOB_RETENTION + timedelta(hours=1))
+    recent = _write_job(job_dir, "recent", OcrJobStatus.succeeded, timedelta(hours=1))
+    incomplete = job_dir / "incomplete"
+    incomplete.mkdir()
+    long_ago = time.time() - 2 * 3600
+    os.utime(incomplete, (long_ago, long_ago))
+
+    await ocr_jobs.sweep_job_dir()
+
+    job = ocr_jobs._load_status("interrupted")
+    assert job.status == OcrJobStatus.failed
+    assert not os.path.exists(os.path.join(interrupted, ocr_jobs.IMAGE_FILENAME))
+    assert ocr_jobs._load_status("active").status == OcrJobStatus.pending
+    assert os.path.exists(os.path.join(active, ocr_jobs.IMAGE_FILENAME))
+    assert not os.path.exists(expired)
+    assert os.path.exists(recent)
+    assert not incomplete.exists()
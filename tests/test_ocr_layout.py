@@ -0,0 +1,44 @@
+import numpy as np
+from src.services import ocr as services_ocr
+
+# 文字の行の代わりに、高さ10px・行間8pxの黒い帯を描いた見開きの1ページ
+# （見出しの下に材料欄（左の段）と手順欄（右の段）がある）
+BLOCKS = {
+    "title": (100, 60, 900, 100),
+    "ingredients_header": (60, 180, 300, 300),
+    "ingredient_names": (60, 360, 250, 600),
+    "ingredient_quantities": (370, 360, 450, 600),
+    "step_1": (540, 180, 940, 260),
+    "step_2": (540, 330, 940, 560),
+    "step_3": (540, 620, 940, 900),
+}
+
+def _two_column_page() -> np.ndarray:
+    page = np.full((1400, 1000), 255, dtype=np.uint8)
+    for x0, y0, x1, y1 in BLOCKS.values():
+        for y in range(y0, y1 - 9, 18):
+            page[y:y + 10, x0:x1] = 0
+    return page
+
+def _label(rect) -> str:
+    x, y, w, h = rect
+    cx, cy = x + w // 2, y + h // 2
+    return next(name for name, (x0, y0, x1, y1) in BLOCKS.items() if x0 <= cx < x1 and y0 <= cy < y1)
+
+def test_two_column_page_is_read_column_by_column():
+    regions = services_ocr.detect_text_regions(_two_column_page())
+
+    assert [_label(rect) for rect in regions] == [
+        "title",
+        "ingredients_header",
+        "ingredient_names",
+        "ingredient_quantities",
+        "step_1",
+        "step_2",
+        "step_3",
+    ]
+
+def test_single_column_rows_keep_left_to_right_order():
+    # 段の幅に満たない分量の列は段とみなさず、行ごとに名前→分量の順で読む
+    regions = [(60, 100, 300, 20), (600, 102, 80, 20), (60, 140, 300, 20), (600, 138, 80, 20)]
+    assert services_ocr._reading_order(regions, 40, 200) == [regions[0], regions[1], regions[2], regions[3]]
@@ -0,0 +1,92 @@
+import hashlib
+import io
+import os
+from datetime import date
+import pytest
+from PIL import Image
+from src.cruds import recipe as crud_recipe
+from src.services import image as services_image
+from src.services.storage import photo_storage
+
+def _png(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+@pytest.fixture
+async def cooking_record(db_sessionmaker):
+    async with db_sessionmaker() as session:
+        recipes = await crud_recipe.create_many_from_book_photos(
+            session,
+            recipes_data=[{"title": "肉じゃが", "ingredients": ["じゃがいも 2個"], "steps": ["煮る"]}],
+            cooking_date=date(2025, 6, 1),
+        )
+    recipe = recipes[0]
+    return recipe.id, recipe.cooking_records[0].id
+
+async def _upload(client, recipe_id, cooking_record_id, data: bytes):
+    response = await client.post(
+        f"/recipe/{recipe_id}/cooking-record/{cooking_record_id}/photo/upload",
+        files={"file": ("photo.png", data, "image/png")},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _stored_files(photo_url: str):
+    filename = photo_url.rsplit("/", 1)[-1]
+    stem = os.path.splitext(filename)[0]
+    names = [filename] + [services_image.derivative_filename(stem, size) for size in services_image.PHOTO_DERIVATIVE_SIZES]
+    return [photo_storage.local_path(name) for name in names]
+
+@pytest.mark.anyio
+async def test_shared_file_is_removed_with_last_reference(client, cooking_record):
+    recipe_id, cooking_record_id = cooking_record
+    data = _png((200, 120, 40))
+    first = await _upload(client, recipe_id, cooking_record_id, data)
+    second = await _upload(client, recipe_id, cooking_record_id, data)
+    assert first["photo_url"] == second["photo_url"]
+    assert (first["width"], first["height"]) == (64, 48)
+    files = _stored_files(first["photo_url"])
+    assert all(os.path.exists(path) for path in files)
+
+    assert (await client.delete(f"/photo/{first['id']}")).status_code == 200
+    assert all(os.path.exists(path) for path in files)
+
+    assert (await client.delete(f"/photo/{second['id']}")).status_code == 200
+    assert not any(os.path.exists(path) for path in files)
+
+@pytest.mark.anyio
+async def test_failed_upload_does_not_leave_unreferenced_file(client, cooking_record):
+    recipe_id, _ = cooking_record
+    data = _png((10, 20, 30))
+    response = await client.post(
+        f"/recipe/{recipe_id}/cooking-record/999/photo/upload",
+        files={"file": ("photo.png", data, "image/png")},
+    )
+    assert response.status_code == 404
+    photo_url = f"/uploads/photos/{hashlib.sha256(data).hexdigest()}.png"
+    assert not any(os.path.exists(path) for path in _stored_files(photo_url))
+    assert not [name for name in os.listdir(photo_storage.work_dir) if name.endswith(".tmp")]
+
+def test_derivatives_are_written_to_temp_files(tmp_path):
+    source = tmp_path / "source.png"
+    source.write_bytes(_png((90, 160, 30)))
+    stem = "a" * 64
+
+    width, height, filenames, generated = services_image.generate_derivatives(str(source), str(tmp_path), stem)
+
+    assert (width, height) == (64, 48)
+    assert sorted(generated) == sorted(services_image.PHOTO_DERIVATIVE_SIZES)
+    for size, path in generated.items():
+        # 確定前の派生画像は最終的なファイル名では見えない
+        assert os.path.dirname(path) == str(tmp_path)
+        assert os.path.basename(path) != filenames[size]
+        assert os.path.getsize(path) > 0
+        assert not (tmp_path / filenames[size]).exists()
+
+@pytest.mark.anyio
+async def test_upload_leaves_no_temp_files(client, cooking_record):
+    recipe_id, cooking_record_id = cooking_record
+    uploaded = await _upload(client, recipe_id, cooking_record_id, _png((5, 90, 200)))
+    assert all(os.path.exists(path) for path in _stored_files(uploaded["photo_url"]))
+    assert not [name for name in os.listdir(photo_storage.work_dir) if name.endswith(".tmp")]
@@ -0,0 +1,91 @@
+import hashlib
+import io
+from datetime import date
+from urllib.parse import urlparse
+import boto3
+import pytest
+from moto import mock_aws
+from PIL import Image
+from src.cruds import recipe as crud_recipe
+from src.routers import photo as photo_router
+from src.services import image as services_image
+from src.services import storage as services_storage
+
+BUCKET = "cooking-memo-test"
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), (30, 120, 200)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+@pytest.fixture
+def s3_storage(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        storage = services_storage.S3PhotoStorage(BUCKET, "photos/", None, "us-east-1")
+        monkeypatch.setattr(services_storage, "photo_storage", storage)
+        monkeypatch.setattr(photo_router, "photo_storage", storage)
+        yield storage
+
+@pytest.fixture
+async def cooking_record(db_sessionmaker):
+    async with db_sessionmaker() as session:
+        recipes = await crud_recipe.create_many_from_book_photos(
+            session,
+            recipes_data=[{"title": "肉じゃが", "ingredients": ["じゃがいも 2個"], "steps": ["煮る"]}],
+            cooking_date=date(2025, 6, 1),
+        )
+    recipe = recipes[0]
+    return recipe.id, recipe.cooking_records[0].id
+
+@pytest.mark.anyio
+async def test_upload_to_s3_and_redirect_to_presigned_url(client, cooking_record, s3_storage):
+    recipe_id, cooking_record_id = cooking_record
+    data = _png()
+    response = await client.post(
+        f"/recipe/{recipe_id}/cooking-record/{cooking_record_id}/photo/upload",
+        files={"file": ("photo.png", data, "image/png")},
+    )
+    assert response.status_code == 200, response.text
+
+    sha256 = hashlib.sha256(data).hexdigest()
+    filename = f"{sha256}.png"
+    assert response.json()["photo_url"] == f"/uploads/photos/{filename}"
+    s3 = boto3.client("s3", region_name="us-east-1")
+    keys = [filename] + [services_image.derivative_filename(sha256, size) for size in services_image.PHOTO_DERIVATIVE_SIZES]
+    for key in keys:
+        head = s3.head_object(Bucket=BUCKET, Key=f"photos/{key}")
+        assert head["CacheControl"] == services_storage.IMMUTABLE_CACHE_CONTROL
+    assert s3.head_object(Bucket=BUCKET, Key=f"photos/{filename}")["ContentType"] == "image/png"
+
+    response = await client.get(f"/uploads/photos/{filename}")
+    assert response.status_code == 307
+    location = urlparse(response.headers["location"])
+    assert location.path.endswith(f"/photos/{filename}")
+    assert BUCKET in location.netloc + location.path
+    assert "Signature" in location.query or "X-Amz-Signature" in location.query
+
+    # サイズ指定では派生画像の署名付きURLへリダイレクトする
+    response = await client.get(f"/uploads/photos/{filename}", params={"size": 100})
+    assert response.status_code == 307
+    assert urlparse(response.headers["location"]).path.endswith(services_image.derivative_filename(sha256, 200))
+
+class _NoUrlStorage(services_storage.PhotoStorage):
+    work_dir = "/tmp"
+
+    async def put_file(self, local_path, key):
+        raise NotImplementedError
+
+    async def exists(self, key):
+        return True
+
+    async def delete(self, key):
+        raise NotImplementedError
+
+@pytest.mark.anyio
+async def test_storage_without_local_path_or_signed_url_is_an_error(client, monkeypatch):
+    monkeypatch.setattr(photo_router, "photo_storage", _NoUrlStorage())
+    response = await client.get(f"/uploads/photos/{'a' * 64}.png")
+    assert response.status_code == 500
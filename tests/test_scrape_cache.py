@@ -0,0 +1,49 @@
+import httpx
+import pytest
+from src.services import http_client
+from src.services import scrape as services_scrape
+from src.services.disk_cache import DiskCache
+
+URL = "https://recipes.example.com/nikujaga"
+HTML = "<html><body><h1>肉じゃが</h1></body></html>"
+ETAG = '"v1"'
+
+@pytest.fixture
+def scrape_cache(monkeypatch, tmp_path):
+    cache = DiskCache(str(tmp_path), 1024 * 1024, ttl=3600, name="scrape_cache")
+    monkeypatch.setattr(services_scrape, "scrape_cache", cache)
+    return cache
+
+@pytest.fixture
+def origin(monkeypatch):
+    """ETagが一致する条件付きリクエストには304を返すサーバー"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304, headers={"ETag": ETAG}, request=request)
+        return httpx.Response(200, text=HTML, headers={"ETag": ETAG, "Content-Type": "text/html; charset=utf-8"}, request=request)
+
+    monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return requests
+
+@pytest.mark.anyio
+async def test_fresh_entry_is_served_without_request(scrape_cache, origin):
+    assert await services_scrape.fetch_html(URL) == HTML
+    assert await services_scrape.fetch_html(URL) == HTML
+    assert len(origin) == 1
+
+@pytest.mark.anyio
+async def test_stale_entry_is_revalidated_with_304(scrape_cache, origin):
+    assert await services_scrape.fetch_html(URL) == HTML
+    scrape_cache.ttl = 0
+
+    assert await services_scrape.fetch_html(URL) == HTML
+    assert len(origin) == 2
+    assert origin[1].headers["if-none-match"] == ETAG
+
+@pytest.mark.anyio
+async def test_unconditional_304_is_an_error(origin):
+    with pytest.raises(httpx.HTTPStatusError):
+        await http_client.fetch(URL, headers={"If-None-Match": ETAG})
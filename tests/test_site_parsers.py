@@ -0,0 +1,24 @@
+import json
+import os
+import pytest
+from src.services import site_parsers
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "fixtures")
+
+with open(os.path.join(FIXTURE_DIR, "manifest.json"), encoding="utf-8") as f:
+    CASES = json.load(f)
+
+@pytest.mark.parametrize("case", CASES, ids=[case["file"] for case in CASES])
+def test_fixture_is_parsed_into_expected_fields(case):
+    with open(os.path.join(FIXTURE_DIR, case["file"]), encoding="utf-8") as f:
+        html = f.read()
+
+    recipe = site_parsers.parse_recipe(html, case["url"])
+
+    assert recipe["title"] == case["title"]
+    assert recipe["source_url"] == case["url"]
+    assert len(recipe["ingredients"]) == case["ingredients"]
+    assert len(recipe["steps"]) == case["steps"]
+    assert recipe["ingredients"][0] == case["first_ingredient"]
+    assert recipe["photo_url"] == case["photo_url"]
+    assert all(isinstance(item, str) and item.strip() for item in recipe["ingredients"] + recipe["steps"])
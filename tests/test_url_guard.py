@@ -0,0 +1,90 @@
+import httpx
+import pytest
+from src.services import http_client
+from src.services import site_parsers
+
+@pytest.fixture
+def transport(monkeypatch):
+    """送信されたリクエストを記録し、routesのURLに応じたレスポンスを返す"""
+    sent = []
+    routes = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(str(request.url))
+        route = routes.get(str(request.url))
+        if route is None:
+            return httpx.Response(404, request=request)
+        return route(request)
+
+    monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return sent, routes
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1:9/internal",
+    "http://localhost/admin",
+    "http://10.0.0.5/",
+    "http://192.168.1.1/",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/",
+    "http://[::ffff:127.0.0.1]/",
+    "file:///etc/passwd",
+    "ftp://recipes.example.com/",
+])
+async def test_non_public_urls_are_rejected_before_sending(transport, url):
+    sent, _ = transport
+    with pytest.raises(http_client.BlockedURLError):
+        await http_client.fetch(url)
+    assert sent == []
+
+@pytest.mark.anyio
+async def test_scrape_endpoint_rejects_internal_url(client, transport):
+    sent, _ = transport
+    response = await client.post("/recipe/scrape", json={"source_url": "http://127.0.0.1:9/internal", "cooking_date": "2025-06-01"})
+    assert response.status_code == 400
+    assert sent == []
+
+@pytest.mark.anyio
+async def test_redirect_to_internal_address_is_not_followed(transport):
+    sent, routes = transport
+    routes["https://recipes.example.com/r"] = lambda request: httpx.Response(
+        302, headers={"Location": "http://127.0.0.1/secret"}, request=request
+    )
+    with pytest.raises(http_client.BlockedURLError):
+        await http_client.fetch("https://recipes.example.com/r")
+    assert sent == ["https://recipes.example.com/r"]
+
+@pytest.mark.anyio
+async def test_public_redirect_is_followed(transport):
+    _, routes = transport
+    routes["https://recipes.example.com/old"] = lambda request: httpx.Response(
+        301, headers={"Location": "https://recipes.example.com/new"}, request=request
+    )
+    routes["https://recipes.example.com/new"] = lambda request: httpx.Response(200, text="ok", request=request)
+    response = await http_client.fetch("https://recipes.example.com/old")
+    assert response.text == "ok"
+
+@pytest.mark.anyio
+async def test_response_body_is_capped(transport):
+    _, routes = transport
+    routes["https://recipes.example.com/big"] = lambda request: httpx.Response(200, content=b"x" * 2048, request=request)
+    with pytest.raises(http_client.ResponseTooLargeError):
+        await http_client.fetch("https://recipes.example.com/big", max_size=1024)
+
+def test_registered_site_parser_takes_precedence_over_json_ld():
+    html = """
+    <html><head><script type="application/ld+json">
+    {"@type": "Recipe", "name": "JSON-LDのタイトル", "recipeIngredient": ["鶏もも肉 300g"], "recipeInstructions": ["揚げる"]}
+    </script></head><body>
+    <h1 class="title">基本の鶏の唐揚げ</h1>
+    <section class="ingredients"><ul>
+      <li class="ingredient-list-item"><a class="ingredient-name">鶏もも肉</a><span class="ingredient-quantity-amount">300g</span></li>
+    </ul></section>
+    <section class="instructions"><ol>
+      <li class="instruction-list-item"><span class="content">下味をつける</span></li>
+    </ol></section>
+    </body></html>
+    """
+    recipe = site_parsers.parse_recipe(html, "https://www.kurashiru.com/recipes/1")
+    assert recipe["title"] == "基本の鶏の唐揚げ"
+    assert recipe["ingredients"] == ["鶏もも肉 300g"]